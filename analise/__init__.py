@@ -0,0 +1,2 @@
+# Módulos de cálculo reutilizados pelas páginas do dashboard.
+# Nada aqui depende do Streamlit: as páginas cuidam do cache e da exibição.
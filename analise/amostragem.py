@@ -0,0 +1,132 @@
+"""Amostra estratificada e estimativas aproximadas com margem de erro.
+
+Estratos: Categoria × Nivel_Entrega × mês do pedido. A amostra tem tamanho
+fixo, então as estimativas custam o mesmo qualquer que seja o tamanho da base.
+Filtros são tratados como estimação em domínios: as linhas da amostra fora do
+filtro contam como zero, mas o tamanho amostral de cada estrato é mantido.
+"""
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+TAMANHO_AMOSTRA = 20_000
+CHAVES_ESTRATO = ['Categoria', 'Nivel_Entrega', 'Mes']
+
+
+def amostra_estratificada(df, tamanho=TAMANHO_AMOSTRA, semente=42):
+    """Sorteia até `tamanho` linhas com alocação proporcional por estrato.
+
+    Cada estrato recebe pelo menos 2 linhas (ou todas, se tiver menos), para
+    que a variância dentro dele possa ser estimada. As colunas N_h e n_h
+    guardam o tamanho do estrato na base e na amostra.
+    """
+    base = df.assign(Mes=df['Data_Pedido'].dt.to_period('M').astype('string'))
+    estrato = base.groupby(CHAVES_ESTRATO, dropna=False, observed=True).ngroup()
+    tamanho_estrato = estrato.map(estrato.value_counts())
+    alocado = np.minimum(tamanho_estrato,
+                         np.maximum(2, np.round(tamanho * tamanho_estrato / max(len(base), 1))))
+
+    # Posição aleatória dentro do estrato: ficam as primeiras n_h
+    rng = np.random.default_rng(semente)
+    embaralhado = estrato.iloc[rng.permutation(len(estrato))]
+    posicao = embaralhado.groupby(embaralhado).cumcount().reindex(estrato.index)
+    selecionado = (posicao < alocado).to_numpy()
+
+    return base[selecionado].assign(
+        estrato=estrato[selecionado].to_numpy(),
+        N_h=tamanho_estrato[selecionado].to_numpy(),
+        n_h=alocado[selecionado].to_numpy(),
+    )
+
+
+def _variancia_total(s1, s2, n, N):
+    # Variância do total estimado a partir das somas Σz e Σz² de cada estrato
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s2_estrato = (s2 - s1**2 / n) / (n - 1)
+        termo = N**2 * (1 - n / N) * s2_estrato / n
+    return np.nansum(np.where(n > 1, termo, 0.0), axis=0)
+
+
+def _razao(soma_y, soma_y2, soma_x, n, N):
+    # Estimador de razão Σy/Σx (x = 1 no domínio) com variância linearizada
+    peso = N / n
+    total_x = (peso * soma_x).sum()
+    if total_x == 0:
+        return np.nan, np.nan
+    razao = (peso * soma_y).sum() / total_x
+    z1 = (soma_y - razao * soma_x) / total_x
+    z2 = (soma_y2 - 2 * razao * soma_y + razao**2 * soma_x) / total_x**2
+    return razao, np.sqrt(_variancia_total(z1, z2, n, N))
+
+
+def estimar_resumo(amostra, mascara, confianca=0.95):
+    """KPIs, top 5 de Estilo por faturamento e distribuição de status.
+
+    Mesmas chaves do resumo exato da página de Análise Exploratória, mais as
+    margens de erro (meia-largura do IC) de cada número estimado. A margem de
+    cada status é dada na escala da proporção, não da contagem. O top 5 de
+    Estilo é escolhido pelas próprias estimativas, então seus totais tendem a
+    sair acima do valor real (viés de seleção); as margens não corrigem isso.
+    """
+    z = stats.norm.ppf((1 + confianca) / 2)
+    estratos = amostra.groupby('estrato')[['n_h', 'N_h']].first()
+    d = amostra[mascara]
+    valor = d['Valor_Pedido']
+    cancelado = (d['Status_Pedido'] == 'Cancelado').astype(float)
+
+    # Somas por estrato dentro do domínio filtrado (estratos ausentes = 0)
+    por_estrato = pd.DataFrame({
+        'linhas': 1.0,
+        'com_valor': valor.notna().astype(float),
+        'valor': valor.fillna(0),
+        'valor2': valor.fillna(0)**2,
+        'cancelados': cancelado,
+    }).groupby(d['estrato']).sum().reindex(estratos.index, fill_value=0)
+    n = estratos['n_h'].to_numpy(dtype=float)
+    N = estratos['N_h'].to_numpy(dtype=float)
+    peso = N / n
+
+    total = (peso * por_estrato['linhas'].to_numpy()).sum()
+    media, ep_media = _razao(por_estrato['valor'].to_numpy(), por_estrato['valor2'].to_numpy(),
+                             por_estrato['com_valor'].to_numpy(), n, N)
+    # Para indicadoras, Σz² = Σz (0² = 0 e 1² = 1)
+    taxa, ep_taxa = _razao(por_estrato['cancelados'].to_numpy(), por_estrato['cancelados'].to_numpy(),
+                           por_estrato['linhas'].to_numpy(), n, N)
+
+    # Distribuição de status: uma razão por status, vetorizada em estratos × status
+    contagens = pd.crosstab(d['estrato'], d['Status_Pedido']).reindex(estratos.index, fill_value=0)
+    c = contagens.to_numpy(dtype=float)
+    linhas = por_estrato['linhas'].to_numpy()[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        proporcao = (peso[:, None] * c).sum(axis=0) / total
+        z1 = (c - proporcao * linhas) / total
+        z2 = (c * (1 - proporcao)**2 + (linhas - c) * proporcao**2) / total**2
+    ep_status = np.sqrt(_variancia_total(z1, z2, n[:, None], N[:, None]))
+
+    # Faturamento por Estilo: totais estratificados agrupados por estrato e Estilo
+    por_estilo = pd.DataFrame({'valor': valor.fillna(0), 'valor2': valor.fillna(0)**2}) \
+        .groupby([d['estrato'], d['Estilo']]).sum()
+    n_e = estratos['n_h'].reindex(por_estilo.index.get_level_values(0)).to_numpy(dtype=float)
+    N_e = estratos['N_h'].reindex(por_estilo.index.get_level_values(0)).to_numpy(dtype=float)
+    s1, s2 = por_estilo['valor'].to_numpy(), por_estilo['valor2'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        termo = np.where(n_e > 1, N_e**2 * (1 - n_e / N_e) * (s2 - s1**2 / n_e) / ((n_e - 1) * n_e), 0.0)
+    estilos = pd.DataFrame({'total': N_e / n_e * s1, 'variancia': termo},
+                           index=por_estilo.index.get_level_values(1)).groupby(level=0).sum()
+    top5 = estilos.sort_values('total', ascending=False).head(5)
+
+    categorias = (d.assign(peso=d['N_h'] / d['n_h']).groupby('Categoria')['peso'].sum())
+
+    return {
+        'total': total,
+        'media_valor': media,
+        'margem_media': z * ep_media,
+        'taxa_cancelamento': taxa,
+        'margem_taxa': z * ep_taxa,
+        'top_categoria': categorias.idxmax() if not categorias.empty else None,
+        'vendas_por_produto': top5['total'],
+        'margem_vendas': z * np.sqrt(top5['variancia']),
+        'status_counts': pd.Series(proporcao * total, index=contagens.columns).sort_values(ascending=False),
+        'margem_status': pd.Series(z * ep_status, index=contagens.columns),
+    }
@@ -0,0 +1,382 @@
+"""Serviço HTTP local (JSON) com os KPIs e testes do dashboard.
+
+Usa as mesmas peças das páginas: carregamento com conversão de moeda,
+`analise.estatisticas` para os cálculos e o mesmo tipo de armazém, com chaves
+por versão da base. O armazém vive na memória do processo: a API roda em
+processo próprio, então reaproveita resultados entre as suas requisições,
+mas não compartilha nada com o cache do Streamlit (nem o contrário).
+Servidor assíncrono só com a biblioteca padrão:
+
+    python -m analise.api --porta 8502
+
+Rotas:
+    GET  /v1/versao  -> versão da base e número de linhas
+    POST /v1/lote    -> {"consultas": [{"tipo": ..., "filtros": {...}, "parametros": {...}}, ...]}
+
+Tipos de consulta: "cancelamento" (parametros: confianca, metodo, meta),
+"ticket" (confianca), "t_test" (categoria_a, categoria_b) e "qui_quadrado".
+Filtros aceitos: periodo [inicio, fim] (datas ISO), categorias [...] e
+niveis [...]. Respostas têm ETag derivada da versão da base e da consulta;
+com If-None-Match igual, o servidor devolve 304 sem recalcular nada.
+
+Uma consulta inválida não derruba o lote: a posição dela traz {"erro": ...}
+com uma das mensagens fixas de `ERROS` (campo e regra violada), nunca o texto
+de uma exceção interna.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from analise.cache_compartilhado import armazem, impressao_digital, versao_dados
+from analise.estatisticas import ic_media, ic_cancelamento, t_test_welch, qui_quadrado_entrega
+from analise.monitoramento import METODOS_INTERVALO, classificar_alerta
+from analise.moedas import carregar_cotacoes, normalizar_moeda
+
+ARQUIVO_DADOS = "df_selecionado.xlsx"
+MAX_CONSULTAS_POR_LOTE = 200
+MAX_CORPO_BYTES = 1024**2
+CALCULOS_SIMULTANEOS = 4
+ESPERA_MAXIMA_SEGUNDOS = 30
+
+MENSAGENS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+             405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+             503: "Service Unavailable"}
+
+
+FILTROS_ACEITOS = ('periodo', 'categorias', 'niveis')
+PARAMETROS_ACEITOS = {'cancelamento': ('confianca', 'metodo', 'meta'), 'ticket': ('confianca',),
+                      't_test': ('categoria_a', 'categoria_b'), 'qui_quadrado': ()}
+
+# Mensagens de erro por consulta: fazem parte do contrato da API
+ERROS = {
+    'consulta': "cada consulta deve ser um objeto",
+    'tipo': f"'tipo' deve ser um de {list(PARAMETROS_ACEITOS)}",
+    'filtros': f"'filtros' deve ser um objeto com as chaves {list(FILTROS_ACEITOS)}",
+    'periodo': "'periodo' deve ser [inicio, fim] com datas ISO (AAAA-MM-DD) sem fuso horário",
+    'categorias': "'categorias' deve ser uma lista de textos",
+    'niveis': "'niveis' deve ser uma lista de textos",
+    'parametros': "'parametros' deve ser um objeto só com os parâmetros aceitos pelo tipo",
+    'confianca': "'confianca' deve ser um número entre 0 e 1",
+    'meta': "'meta' deve ser um número entre 0 e 1",
+    'metodo': f"'metodo' deve ser um de {list(METODOS_INTERVALO)}",
+    'categorias_t_test': "t_test exige 'categoria_a' e 'categoria_b' como textos",
+    'segmento_vazio': "nenhum pedido no segmento",
+    'poucos_valores': "são necessários pelo menos 2 pedidos com valor",
+    'amostras_pequenas': "amostras com menos de 2 observações",
+    'qui_quadrado': "dados insuficientes para o teste qui-quadrado",
+    'interno': "falha interna ao calcular a consulta",
+}
+
+
+class ErroConsulta(ValueError):
+    """Consulta inválida; a mensagem é uma das entradas de `ERROS`."""
+
+    def __init__(self, codigo):
+        super().__init__(ERROS[codigo])
+
+
+class BaseDados:
+    """Base carregada uma vez e recarregada quando o arquivo muda no disco."""
+
+    def __init__(self, caminho=ARQUIVO_DADOS):
+        self.caminho = caminho
+        self._trava = threading.Lock()
+        self._modificado = None
+        self.df = None
+        self.versao = None
+
+    def atual(self):
+        modificado = os.path.getmtime(self.caminho)
+        with self._trava:
+            if modificado != self._modificado:
+                df = pd.read_excel(self.caminho)
+                df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], errors='coerce')
+                self.df = normalizar_moeda(df, carregar_cotacoes())
+                self.versao = versao_dados(self.df)
+                self._modificado = modificado
+            return self.df, self.versao
+
+
+def _fracao(parametros, nome, padrao):
+    # Número estritamente entre 0 e 1 (bool é int no Python e fica de fora)
+    valor = parametros.get(nome, padrao)
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)) or not 0 < valor < 1:
+        raise ErroConsulta(nome)
+    return float(valor)
+
+
+def _validar_filtros(filtros):
+    """Filtros normalizados: periodo como Timestamps e seleções como `set`."""
+    if not isinstance(filtros, dict) or not set(filtros) <= set(FILTROS_ACEITOS):
+        raise ErroConsulta('filtros')
+    validos = {}
+    if filtros.get('periodo'):
+        periodo = filtros['periodo']
+        if not isinstance(periodo, list) or len(periodo) != 2 or not all(isinstance(d, str) for d in periodo):
+            raise ErroConsulta('periodo')
+        try:
+            datas = [pd.Timestamp(d) for d in periodo]
+        except (ValueError, OverflowError):
+            raise ErroConsulta('periodo')
+        if any(pd.isna(d) or d.tz is not None for d in datas):
+            raise ErroConsulta('periodo')
+        validos['periodo'] = datas
+    for nome in ('categorias', 'niveis'):
+        if filtros.get(nome):
+            valores = filtros[nome]
+            if not isinstance(valores, list) or not all(isinstance(v, str) for v in valores):
+                raise ErroConsulta(nome)
+            # A ordem das seleções não altera o resultado nem a chave
+            validos[nome] = set(valores)
+    return validos
+
+
+def _validar_parametros(tipo, parametros):
+    """Parâmetros do tipo com os valores padrão preenchidos."""
+    if not isinstance(parametros, dict) or not set(parametros) <= set(PARAMETROS_ACEITOS[tipo]):
+        raise ErroConsulta('parametros')
+    validos = {}
+    if tipo in ('cancelamento', 'ticket'):
+        validos['confianca'] = _fracao(parametros, 'confianca', 0.95)
+    if tipo == 'cancelamento':
+        validos['metodo'] = parametros.get('metodo', "Wald")
+        if not isinstance(validos['metodo'], str) or validos['metodo'] not in METODOS_INTERVALO:
+            raise ErroConsulta('metodo')
+        validos['meta'] = _fracao(parametros, 'meta', 0.10)
+    if tipo == 't_test':
+        for nome in ('categoria_a', 'categoria_b'):
+            if not isinstance(parametros.get(nome), str):
+                raise ErroConsulta('categorias_t_test')
+            validos[nome] = parametros[nome]
+    return validos
+
+
+def _filtrar(df, filtros):
+    mascara = pd.Series(True, index=df.index)
+    if filtros.get('periodo'):
+        inicio, fim = filtros['periodo']
+        mascara &= (df['Data_Pedido'] >= inicio) & (df['Data_Pedido'] <= fim)
+    if filtros.get('categorias'):
+        mascara &= df['Categoria'].isin(filtros['categorias'])
+    if filtros.get('niveis'):
+        mascara &= df['Nivel_Entrega'].isin(filtros['niveis'])
+    return df[mascara]
+
+
+def _json(valor):
+    # Converte numpy/pandas em tipos do JSON; NaN e ±inf viram null
+    if isinstance(valor, dict):
+        return {str(k): _json(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_json(v) for v in valor]
+    if isinstance(valor, pd.DataFrame):
+        return {str(i): _json(linha.to_dict()) for i, linha in valor.iterrows()}
+    if isinstance(valor, np.ndarray):
+        return _json(valor.tolist())
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and not np.isfinite(valor):
+        return None
+    return valor
+
+
+# As funções abaixo recebem parâmetros já validados por `_validar_parametros`
+
+def _cancelamento(df, parametros):
+    if df.empty:
+        raise ErroConsulta('segmento_vazio')
+    resultado = ic_cancelamento(df, parametros['confianca'], parametros['metodo'])
+    resultado['alerta'] = classificar_alerta(resultado['ic_min'], resultado['ic_max'], parametros['meta'])
+    return resultado
+
+
+def _ticket(df, parametros):
+    if df['Valor_Pedido'].count() < 2:
+        raise ErroConsulta('poucos_valores')
+    return ic_media(df['Valor_Pedido'], parametros['confianca'])
+
+
+def _t_test(df, parametros):
+    cat1, cat2 = parametros['categoria_a'], parametros['categoria_b']
+    sample1 = df[df['Categoria'] == cat1]['Valor_Pedido'].dropna()
+    sample2 = df[df['Categoria'] == cat2]['Valor_Pedido'].dropna()
+    if len(sample1) < 2 or len(sample2) < 2:
+        raise ErroConsulta('amostras_pequenas')
+    t_stat, p_val, gl = t_test_welch(sample1, sample2)
+    return {'t_stat': t_stat, 'p_valor': p_val, 'gl': gl,
+            'media_a': sample1.mean(), 'media_b': sample2.mean()}
+
+
+def _qui_quadrado(df, parametros):
+    contingency, resultado = qui_quadrado_entrega(df)
+    if resultado is None:
+        raise ErroConsulta('qui_quadrado')
+    chi2, p_chi, dof, expected = resultado
+    return {'chi2': chi2, 'p_valor': p_chi, 'gl': dof, 'observado': contingency,
+            'esperado': pd.DataFrame(expected, index=contingency.index, columns=contingency.columns)}
+
+
+TIPOS = {'cancelamento': _cancelamento, 'ticket': _ticket, 't_test': _t_test, 'qui_quadrado': _qui_quadrado}
+
+
+def responder_lote(df, versao, consultas):
+    """Avalia várias consultas; cada uma passa pelo armazém deste processo.
+
+    Consultas com os mesmos filtros compartilham o recorte da base, montado
+    uma única vez por lote (e só se alguma delas não estiver no armazém).
+    Erros de uma consulta não derrubam o lote: viram {"erro": ...} na posição
+    dela, sempre com uma mensagem de `ERROS`.
+    """
+    segmentos = {}
+
+    def segmento(filtros):
+        chave = impressao_digital(versao, "api/segmento", filtros=filtros)
+        if chave not in segmentos:
+            segmentos[chave] = _filtrar(df, filtros)
+        return segmentos[chave]
+
+    respostas = []
+    for consulta in consultas:
+        tipo = consulta.get('tipo') if isinstance(consulta, dict) else None
+        try:
+            if not isinstance(consulta, dict):
+                raise ErroConsulta('consulta')
+            if not isinstance(tipo, str) or tipo not in TIPOS:
+                raise ErroConsulta('tipo')
+            filtros = _validar_filtros(consulta.get('filtros') or {})
+            parametros = _validar_parametros(tipo, consulta.get('parametros') or {})
+            chave = impressao_digital(versao, f"api/{tipo}", filtros=filtros, parametros=parametros)
+            resultado = armazem.obter_ou_calcular(
+                chave, lambda: _json(TIPOS[tipo](segmento(filtros), parametros)))
+            respostas.append({'tipo': tipo, 'resultado': resultado})
+        except ErroConsulta as erro:
+            respostas.append({'tipo': tipo if isinstance(tipo, str) else None, 'erro': str(erro)})
+        except Exception as erro:
+            # Detalhes ficam no log do servidor; o cliente recebe a mensagem fixa
+            print(f"Falha na consulta {tipo!r}: {erro!r}", file=sys.stderr)
+            respostas.append({'tipo': tipo if isinstance(tipo, str) else None, 'erro': ERROS['interno']})
+    return {'versao': versao, 'respostas': respostas}
+
+
+class Servidor:
+    """Servidor HTTP/1.1 mínimo sobre asyncio (uma requisição por conexão)."""
+
+    def __init__(self, base, calculos_simultaneos=CALCULOS_SIMULTANEOS):
+        self.base = base
+        self._limite = asyncio.Semaphore(calculos_simultaneos)
+        self._executor = ThreadPoolExecutor(max_workers=calculos_simultaneos)
+
+    async def _calcular(self, funcao, *args):
+        # Limita quantos acessos à base rodam ao mesmo tempo; quem espera demais recebe 503
+        try:
+            await asyncio.wait_for(self._limite.acquire(), ESPERA_MAXIMA_SEGUNDOS)
+        except asyncio.TimeoutError:
+            return None
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, funcao, *args)
+        finally:
+            self._limite.release()
+
+    async def _tratar(self, metodo, rota, cabecalhos, corpo):
+        if rota == "/v1/versao":
+            if metodo != "GET":
+                return 405, {'erro': "use GET"}, None
+            resultado = await self._calcular(self.base.atual)
+            if resultado is None:
+                return 503, {'erro': "servidor ocupado"}, None
+            df, versao = resultado
+            return 200, {'versao': versao, 'linhas': len(df)}, None
+
+        if rota == "/v1/lote":
+            if metodo != "POST":
+                return 405, {'erro': "use POST"}, None
+            try:
+                pedido = json.loads(corpo or b"{}")
+                consultas = pedido['consultas']
+            except (ValueError, KeyError, TypeError):
+                return 400, {'erro': "corpo deve ser JSON com a lista 'consultas'"}, None
+            if not isinstance(consultas, list) or len(consultas) > MAX_CONSULTAS_POR_LOTE:
+                return 400, {'erro': f"'consultas' deve ser uma lista com até {MAX_CONSULTAS_POR_LOTE} itens"}, None
+
+            resultado = await self._calcular(self._lote, consultas, cabecalhos.get('if-none-match'))
+            if resultado is None:
+                return 503, {'erro': "servidor ocupado"}, None
+            return resultado
+
+        return 404, {'erro': "rota não encontrada"}, None
+
+    def _lote(self, consultas, etag_cliente):
+        # Roda dentro do limite de cálculos: até a leitura da base (que pode
+        # recarregar a planilha) conta para o semáforo
+        df, versao = self.base.atual()
+        # A ETag depende só da versão da base e da consulta: dá para responder 304 antes de calcular
+        conteudo = json.dumps(consultas, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        etag = '"' + hashlib.sha256(versao.encode() + b":" + conteudo).hexdigest()[:32] + '"'
+        if etag_cliente == etag:
+            return 304, None, etag
+        return 200, responder_lote(df, versao, consultas), etag
+
+    async def conexao(self, reader, writer):
+        try:
+            try:
+                cabecalho = await reader.readuntil(b"\r\n\r\n")
+                linhas = cabecalho.decode('latin-1').split("\r\n")
+                metodo, alvo, _ = linhas[0].split(" ", 2)
+                cabecalhos = {k.strip().lower(): v.strip()
+                              for k, v in (l.split(":", 1) for l in linhas[1:] if ":" in l)}
+                tamanho = int(cabecalhos.get('content-length', 0))
+                if tamanho < 0:
+                    raise ValueError("content-length negativo")
+                # Corpo truncado também é requisição inválida, não erro da conexão
+                corpo = await reader.readexactly(tamanho) if 0 < tamanho <= MAX_CORPO_BYTES else b""
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                status, resposta, etag = 400, {'erro': "requisição HTTP inválida"}, None
+            else:
+                if tamanho > MAX_CORPO_BYTES:
+                    status, resposta, etag = 413, {'erro': "corpo muito grande"}, None
+                else:
+                    try:
+                        status, resposta, etag = await self._tratar(metodo, alvo.split("?", 1)[0], cabecalhos, corpo)
+                    except Exception as erro:
+                        print(f"Falha ao tratar {metodo} {alvo}: {erro!r}", file=sys.stderr)
+                        status, resposta, etag = 500, {'erro': "erro interno do servidor"}, None
+
+            dados = b"" if resposta is None else json.dumps(resposta, ensure_ascii=False).encode('utf-8')
+            extras = f"ETag: {etag}\r\nCache-Control: no-cache\r\n" if etag else ""
+            writer.write((f"HTTP/1.1 {status} {MENSAGENS[status]}\r\n"
+                          f"Content-Type: application/json; charset=utf-8\r\n"
+                          f"Content-Length: {len(dados)}\r\n{extras}Connection: close\r\n\r\n").encode('latin-1')
+                         + dados)
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+async def servir(host, porta, caminho):
+    servidor = Servidor(BaseDados(caminho))
+    tcp = await asyncio.start_server(servidor.conexao, host, porta)
+    print(f"API do dashboard em http://{host}:{porta}")
+    async with tcp:
+        await tcp.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API JSON local com os KPIs e testes do dashboard")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8502)
+    parser.add_argument("--arquivo", default=ARQUIVO_DADOS, help="planilha com os pedidos")
+    args = parser.parse_args(argv)
+    asyncio.run(servir(args.host, args.porta, args.arquivo))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Armazém de resultados compartilhado entre sessões do dashboard.
+
+Cada sessão do Streamlit executa as páginas de forma independente; aqui os
+resultados ficam no processo, indexados por uma impressão digital canônica de
+(versão dos dados, página, filtros, parâmetros). Pedidos idênticos simultâneos
+esperam uma única execução (single-flight) e um orçamento de memória remove os
+resultados usados há mais tempo.
+"""
+
+import datetime
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+LIMITE_PADRAO_BYTES = 256 * 1024**2
+
+
+def versao_dados(df):
+    """Hash do conteúdo da base; muda sempre que qualquer valor muda."""
+    hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hashlib.sha256(hashes.tobytes()).hexdigest()[:16]
+
+
+def _canonico(valor):
+    # Converte filtros e parâmetros para uma forma JSON estável
+    if isinstance(valor, dict):
+        return {str(k): _canonico(v) for k, v in sorted(valor.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(valor, (set, frozenset)):
+        return sorted((_canonico(v) for v in valor), key=repr)
+    if isinstance(valor, (list, tuple)):
+        return [_canonico(v) for v in valor]
+    if isinstance(valor, (pd.Timestamp, datetime.date, datetime.datetime, np.datetime64)):
+        return pd.Timestamp(valor).isoformat()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+
+def impressao_digital(versao, pagina, filtros=None, parametros=None):
+    """Chave canônica do resultado.
+
+    Seleções múltiplas (multiselect) devem ser passadas como `set`, pois a
+    ordem em que o usuário clicou não altera o resultado.
+    """
+    conteudo = {
+        'versao': versao,
+        'pagina': pagina,
+        'filtros': _canonico(filtros or {}),
+        'parametros': _canonico(parametros or {}),
+    }
+    texto = json.dumps(conteudo, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()
+
+
+def _tamanho(obj):
+    # Estimativa do espaço ocupado, suficiente para o orçamento de memória
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        uso = obj.memory_usage(deep=True)
+        return int(uso.sum() if hasattr(uso, 'sum') else uso)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_tamanho(k) + _tamanho(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(_tamanho(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class _EmAndamento:
+    # Cálculo em execução: quem chega depois espera o evento
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class ArmazemResultados:
+    """Cache LRU thread-safe com single-flight e limite de memória em bytes."""
+
+    def __init__(self, limite_bytes=LIMITE_PADRAO_BYTES):
+        self.limite_bytes = limite_bytes
+        self._itens = OrderedDict()  # chave -> (resultado, tamanho)
+        self._em_andamento = {}
+        self._bytes = 0
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter_ou_calcular(self, chave, calcular):
+        """Devolve o resultado da chave, executando `calcular()` só se preciso."""
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return self._itens[chave][0]
+            andamento = self._em_andamento.get(chave)
+            dono = andamento is None
+            if dono:
+                andamento = self._em_andamento[chave] = _EmAndamento()
+                self.faltas += 1
+
+        if not dono:
+            andamento.evento.wait()
+            if andamento.erro is not None:
+                raise andamento.erro
+            return andamento.resultado
+
+        try:
+            andamento.resultado = calcular()
+        except BaseException as erro:
+            # Erros não ficam em cache: a próxima chamada tenta de novo
+            andamento.erro = erro
+            raise
+        else:
+            self._guardar(chave, andamento.resultado)
+        finally:
+            with self._trava:
+                del self._em_andamento[chave]
+            andamento.evento.set()
+        return andamento.resultado
+
+    def _guardar(self, chave, resultado):
+        tamanho = _tamanho(resultado)
+        if tamanho > self.limite_bytes:
+            return
+        with self._trava:
+            if chave in self._itens:
+                self._bytes -= self._itens.pop(chave)[1]
+            self._itens[chave] = (resultado, tamanho)
+            self._bytes += tamanho
+            while self._bytes > self.limite_bytes:
+                _, (_, removido) = self._itens.popitem(last=False)
+                self._bytes -= removido
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        with self._trava:
+            return {
+                'itens': len(self._itens),
+                'bytes': self._bytes,
+                'limite_bytes': self.limite_bytes,
+                'acertos': self.acertos,
+                'faltas': self.faltas,
+            }
+
+
+# Instância única por processo: todas as sessões do Streamlit importam este
+# módulo uma vez, então compartilham o mesmo armazém. Outros processos (como
+# `python -m analise.api`) têm o seu próprio, sem resultados em comum
+armazem = ArmazemResultados()
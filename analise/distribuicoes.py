@@ -0,0 +1,112 @@
+"""Comparação de distribuições B2B x B2C a partir de arrays pré-ordenados."""
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+GRUPOS = ("B2B", "B2C")
+
+
+def _eh_b2b(serie):
+    # A coluna pode vir como booleano ou como texto (Verdadeiro/Falso, True/False)
+    if serie.dtype == bool:
+        return serie.to_numpy()
+    texto = serie.astype('string').str.strip().str.lower()
+    return texto.isin(['true', 'verdadeiro', 'v', '1', 'sim']).to_numpy()
+
+
+def preordenar_por_grupo(df):
+    """Separa Valor_Pedido em B2B e B2C, cada grupo já ordenado pelo valor.
+
+    Data, categoria e nível de entrega acompanham a mesma ordem, de modo que
+    aplicar os filtros é só uma máscara booleana: o resultado continua
+    ordenado e a ordenação acontece uma única vez, no carregamento.
+    """
+    base = df.dropna(subset=['Valor_Pedido'])
+    b2b = _eh_b2b(base['B2B'])
+    categorias = base['Categoria'].astype('category')
+    niveis = base['Nivel_Entrega'].astype('category')
+
+    grupos = {}
+    for nome, mascara in zip(GRUPOS, (b2b, ~b2b)):
+        valores = base['Valor_Pedido'].to_numpy(dtype=float)[mascara]
+        ordem = np.argsort(valores, kind='stable')
+        grupos[nome] = {
+            'valores': valores[ordem],
+            'datas': base['Data_Pedido'].to_numpy()[mascara][ordem],
+            'categorias': categorias.cat.codes.to_numpy()[mascara][ordem],
+            'niveis': niveis.cat.codes.to_numpy()[mascara][ordem],
+        }
+    return {
+        'grupos': grupos,
+        'categorias': list(categorias.cat.categories),
+        'niveis': list(niveis.cat.categories),
+    }
+
+
+def filtrar_ordenados(preordenado, grupo, inicio, fim, categorias=None, niveis=None):
+    """Valores de um grupo que passam nos filtros, ainda em ordem crescente."""
+    g = preordenado['grupos'][grupo]
+    mascara = (g['datas'] >= np.datetime64(inicio)) & (g['datas'] <= np.datetime64(fim))
+    if categorias:
+        codigos = [preordenado['categorias'].index(c) for c in categorias if c in preordenado['categorias']]
+        mascara &= np.isin(g['categorias'], codigos)
+    if niveis:
+        codigos = [preordenado['niveis'].index(n) for n in niveis if n in preordenado['niveis']]
+        mascara &= np.isin(g['niveis'], codigos)
+    return g['valores'][mascara]
+
+
+def _unir_ordenados(x, y):
+    # Timsort reconhece as duas sequências já ordenadas e apenas as intercala
+    return np.sort(np.concatenate([x, y]), kind='stable')
+
+
+def teste_ks(x, y):
+    """Kolmogorov-Smirnov de duas amostras para arrays já ordenados."""
+    n1, n2 = len(x), len(y)
+    pontos = _unir_ordenados(x, y)
+    cdf1 = np.searchsorted(x, pontos, side='right') / n1
+    cdf2 = np.searchsorted(y, pontos, side='right') / n2
+    d = np.abs(cdf1 - cdf2).max()
+    # Mesma aproximação que o scipy usa no modo 'asymp'
+    p_valor = stats.kstwo.sf(d, np.round(n1 * n2 / (n1 + n2)))
+    return d, min(max(p_valor, 0.0), 1.0)
+
+
+def teste_mann_whitney(x, y):
+    """Mann-Whitney U bilateral (aproximação normal com correção de empates
+    e de continuidade) para arrays já ordenados."""
+    n1, n2 = len(x), len(y)
+    # U1 = nº de pares com x > y, contando empates como meio
+    abaixo = np.searchsorted(y, x, side='left')
+    ate = np.searchsorted(y, x, side='right')
+    u1 = (abaixo + (ate - abaixo) / 2).sum()
+
+    # Tamanho de cada bloco de empates na amostra combinada
+    combinado = _unir_ordenados(x, y)
+    quebras = np.flatnonzero(np.diff(combinado)) + 1
+    empates = np.diff(np.concatenate(([0], quebras, [len(combinado)])))
+    n = n1 + n2
+    variancia = n1 * n2 / 12 * ((n + 1) - (empates**3 - empates).sum() / (n * (n - 1)))
+
+    media = n1 * n2 / 2
+    z = (abs(u1 - media) - 0.5) / np.sqrt(variancia)
+    p_valor = min(2 * stats.norm.sf(z), 1.0)
+    return u1, p_valor
+
+
+def _quantis_ordenados(valores, probabilidades):
+    # Quantis com interpolação linear (igual ao padrão do numpy) sem reordenar
+    posicao = probabilidades * (len(valores) - 1)
+    return np.interp(posicao, np.arange(len(valores)), valores)
+
+
+def curva_qq(x, y, pontos=99):
+    """Quantis correspondentes das duas amostras para o gráfico Q-Q."""
+    probabilidades = np.linspace(0.01, 0.99, pontos)
+    return pd.DataFrame({
+        'probabilidade': probabilidades,
+        'quantil_x': _quantis_ordenados(x, probabilidades),
+        'quantil_y': _quantis_ordenados(y, probabilidades),
+    })
@@ -0,0 +1,58 @@
+"""Cálculos das páginas de Intervalos de Confiança e Testes de Hipótese.
+
+Funções puras, sem Streamlit, para que os mesmos números exibidos nas
+páginas possam ser conferidos fora do dashboard (ver `analise.regressao`).
+"""
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+from analise.monitoramento import intervalo_proporcao
+
+
+def ic_media(valores, confianca=0.95):
+    """IC t para a média de Valor_Pedido (página 4, análise 1)."""
+    amostra = pd.Series(valores).dropna()
+    n = len(amostra)
+    media = np.mean(amostra)
+    desvio = np.std(amostra, ddof=1)
+    t_critico = stats.t.ppf((1 + confianca)/2, df=n-1)
+    margem = t_critico * (desvio / np.sqrt(n))
+    return {'n': n, 'media': media, 'desvio': desvio, 'ic_min': media - margem, 'ic_max': media + margem}
+
+
+def ic_cancelamento(df, confianca=0.95, metodo="Wald"):
+    """IC para a proporção de pedidos cancelados (página 4, análise 2)."""
+    cancelados = df[df['Status_Pedido'] == 'Cancelado'].shape[0]
+    total = df.shape[0]
+    ic_min, ic_max = intervalo_proporcao(cancelados, total, confianca, metodo)
+    return {'cancelados': cancelados, 'total': total, 'p_hat': cancelados / total,
+            'ic_min': ic_min, 'ic_max': ic_max}
+
+
+def ic_categoria(df, categoria, confianca=0.95):
+    """IC t para o ticket médio de uma categoria (página 4, análise 3)."""
+    dados = df[df['Categoria'] == categoria]['Valor_Pedido'].dropna()
+    ic = stats.t.interval(confianca, len(dados)-1, loc=np.mean(dados), scale=stats.sem(dados))
+    return dados, ic
+
+
+def t_test_welch(amostra1, amostra2):
+    """t-test de Welch com os graus de liberdade aproximados (página 5, teste 1)."""
+    t_stat, p_val = stats.ttest_ind(amostra1, amostra2, equal_var=False)
+    var1, var2 = amostra1.var(ddof=1)/len(amostra1), amostra2.var(ddof=1)/len(amostra2)
+    gl = (var1 + var2)**2 / (var1**2/(len(amostra1)-1) + var2**2/(len(amostra2)-1))
+    return t_stat, p_val, gl
+
+
+def qui_quadrado_entrega(df):
+    """Tabela Nivel_Entrega x Status_Pedido e teste de independência (página 5, teste 2).
+
+    Devolve a tabela e o resultado de `chi2_contingency`, ou None quando a
+    tabela não tem ao menos duas linhas e duas colunas.
+    """
+    contingency = pd.crosstab(df['Nivel_Entrega'], df['Status_Pedido'])
+    if contingency.shape[0] < 2 or contingency.shape[1] < 2:
+        return contingency, None
+    return contingency, stats.chi2_contingency(contingency)
@@ -0,0 +1,130 @@
+"""Momentos por estado/cidade e comparações geográficas do ticket médio."""
+
+import numpy as np
+import pandas as pd
+import scipy.stats as stats
+
+from analise.monitoramento import intervalo_proporcao
+
+NIVEIS = {"Estado": ['Ship State'], "Cidade": ['Ship State', 'Ship City']}
+
+
+def _normalizar(coluna):
+    # Nomes de cidades/estados chegam com caixa e espaços inconsistentes
+    return coluna.astype('string').str.strip().str.upper()
+
+
+def precomputar_regioes(df):
+    """Calcula, em uma passada agrupada por nível, as estatísticas suficientes.
+
+    Para cada região: pedidos, n_valor (pedidos com valor), soma, soma_quadrados
+    e cancelados. Para os estados guarda também as estatísticas de postos do
+    Kruskal-Wallis (ver `_postos_estados`), que são só combinadas por seleção.
+    """
+    base = pd.DataFrame({
+        'Ship State': _normalizar(df['Ship State']),
+        'Ship City': _normalizar(df['Ship City']),
+        'valor': df['Valor_Pedido'],
+        'valor2': df['Valor_Pedido']**2,
+        'cancelado': (df['Status_Pedido'] == 'Cancelado').astype(int),
+    }).dropna(subset=['Ship State'])
+
+    regioes = {}
+    for nivel, chaves in NIVEIS.items():
+        regioes[nivel] = base.dropna(subset=chaves).groupby(chaves, observed=True).agg(
+            pedidos=('cancelado', 'size'),
+            n_valor=('valor', 'count'),
+            soma=('valor', 'sum'),
+            soma_quadrados=('valor2', 'sum'),
+            cancelados=('cancelado', 'sum'),
+        )
+    return {'regioes': regioes, 'postos_estados': _postos_estados(base, regioes['Estado']['pedidos'])}
+
+
+def _postos_estados(base, pedidos):
+    """Estatísticas de postos por estado, calculadas uma vez sobre os pedidos.
+
+    'pares' é a matriz de Mann-Whitney U[a, b] = #(valor de a > valor de b)
+    + ½ #(empates); a soma de postos de a dentro de qualquer conjunto S de
+    estados é a soma de U[a, S] mais n_a/2. A correção de empates não se
+    decompõe por pares, mas o teste sempre mantém os estados com pedidos ≥
+    mínimo, então os conjuntos são encaixados: 'empates' guarda Σ(t³ - t)
+    para cada corte possível de pedidos.
+    """
+    contagens = (base.dropna(subset=['valor'])
+                 .groupby(['valor', 'Ship State'], observed=True).size()
+                 .unstack(fill_value=0).sort_index()
+                 .reindex(columns=pedidos.index, fill_value=0))
+    m = contagens.to_numpy(dtype=float)
+    abaixo = np.cumsum(m, axis=0) - m
+    pares = pd.DataFrame(m.T @ (abaixo + m / 2), index=pedidos.index, columns=pedidos.index)
+
+    # Estados do maior para o menor número de pedidos: cada prefixo é um corte
+    ordem = np.argsort(-pedidos.to_numpy(), kind='stable')
+    acumulado = np.cumsum(m[:, ordem], axis=1)
+    empates = (pd.Series((acumulado**3 - acumulado).sum(axis=0), index=pedidos.to_numpy()[ordem])
+               .groupby(level=0).last())  # com pedidos repetidos vale o maior prefixo
+    return {'pares': pares, 'empates': empates}
+
+
+def ranking_regioes(momentos, ordenar_por='ticket_medio', confianca=0.95, min_pedidos=30):
+    """Ticket médio e taxa de cancelamento por região, com ICs, já ordenados.
+
+    Tudo é derivado dos momentos, sem revisitar os pedidos, então o custo é
+    proporcional ao número de regiões.
+    """
+    m = momentos[momentos['pedidos'] >= min_pedidos]
+    n = m['n_valor'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media = m['soma'].to_numpy() / n
+        variancia = (m['soma_quadrados'].to_numpy() - n * media**2) / (n - 1)
+        erro_padrao = np.sqrt(np.clip(variancia, 0, None) / n)
+    t_critico = stats.t.ppf((1 + confianca) / 2, np.clip(n - 1, 1, None))
+    taxa_min, taxa_max = intervalo_proporcao(m['cancelados'].to_numpy(), m['pedidos'].to_numpy(),
+                                             confianca, metodo="Wilson")
+
+    ranking = pd.DataFrame({
+        'pedidos': m['pedidos'].to_numpy(),
+        'ticket_medio': media,
+        'ic_ticket_min': media - t_critico * erro_padrao,
+        'ic_ticket_max': media + t_critico * erro_padrao,
+        'taxa_cancelamento': m['cancelados'].to_numpy() / m['pedidos'].to_numpy(),
+        'ic_taxa_min': taxa_min,
+        'ic_taxa_max': taxa_max,
+    }, index=m.index)
+    return ranking.sort_values(ordenar_por, ascending=False)
+
+
+def comparar_regioes(momentos, postos_estados, min_pedidos=30):
+    """ANOVA de um fator (pelos momentos) e Kruskal-Wallis entre os estados.
+
+    Os dois testes combinam apenas estatísticas pré-computadas, então o custo
+    depende do número de estados, não do número de pedidos.
+    """
+    m = momentos[(momentos['pedidos'] >= min_pedidos) & (momentos['n_valor'] > 0)]
+    k = len(m)
+    n_i = m['n_valor'].to_numpy(dtype=float)
+    n = n_i.sum()
+    if k < 2 or n <= k:
+        return None
+
+    # ANOVA: somas de quadrados entre e dentro dos grupos pelas somas suficientes
+    soma_total = m['soma'].sum()
+    sq_entre = (m['soma'].to_numpy()**2 / n_i).sum() - soma_total**2 / n
+    sq_dentro = m['soma_quadrados'].sum() - (m['soma'].to_numpy()**2 / n_i).sum()
+    f_stat = (sq_entre / (k - 1)) / (sq_dentro / (n - k))
+    p_anova = stats.f.sf(f_stat, k - 1, n - k)
+
+    # Kruskal-Wallis: postos só entre os estados mantidos no teste
+    soma_postos = postos_estados['pares'].loc[m.index, m.index].to_numpy().sum(axis=1) + n_i / 2
+    empates = postos_estados['empates']
+    correcao = 1 - empates.iloc[np.searchsorted(empates.index, min_pedidos)] / (n**3 - n)
+    h = 12 / (n * (n + 1)) * (soma_postos**2 / n_i).sum() - 3 * (n + 1)
+    h = h / correcao if correcao > 0 else np.nan
+    p_kruskal = stats.chi2.sf(h, k - 1)
+
+    return {
+        'grupos': k,
+        'f_stat': f_stat, 'p_anova': p_anova, 'gl_entre': k - 1, 'gl_dentro': int(n - k),
+        'h_stat': h, 'p_kruskal': p_kruskal,
+    }
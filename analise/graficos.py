@@ -0,0 +1,88 @@
+"""Redução de pontos antes de desenhar gráficos.
+
+O custo de renderizar e o tamanho da figura passam a depender do número de
+pontos exibidos, e não do número de pedidos.
+"""
+
+import numpy as np
+import pandas as pd
+
+PONTOS_SERIE = 500
+BINS_HISTOGRAMA = 100
+MAX_OUTLIERS = 200
+
+
+def lttb(serie, limite=PONTOS_SERIE):
+    """Largest-Triangle-Three-Buckets: reduz uma série a `limite` pontos.
+
+    Mantém o primeiro e o último ponto e, em cada balde, o ponto que forma o
+    maior triângulo com o ponto escolhido antes e a média do próximo balde,
+    preservando picos e vales. Aceita índice numérico ou de datas.
+    """
+    serie = serie.dropna()
+    n = len(serie)
+    if limite >= n or limite < 3:
+        return serie
+
+    indice = serie.index
+    x = (indice.asi8 if isinstance(indice, pd.DatetimeIndex) else np.asarray(indice)).astype(float)
+    y = serie.to_numpy(dtype=float)
+
+    limites = np.linspace(1, n - 1, limite - 1).astype(int)
+    escolhidos = np.empty(limite, dtype=int)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+    for b in range(limite - 2):
+        inicio, fim = limites[b], limites[b + 1]
+        prox_inicio, prox_fim = limites[b + 1], limites[b + 2] if b + 2 < len(limites) else n
+        media_x = x[prox_inicio:prox_fim].mean()
+        media_y = y[prox_inicio:prox_fim].mean()
+        # Área (dobrada) do triângulo anterior -> candidato -> média do próximo balde
+        area = np.abs((x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+                      - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior]))
+        anterior = inicio + int(np.argmax(area))
+        escolhidos[b + 1] = anterior
+    return serie.iloc[escolhidos]
+
+
+def histograma(valores, bins=BINS_HISTOGRAMA):
+    """Contagens em `bins` faixas de mesma largura.
+
+    Cada linha traz os limites da faixa, o centro, a contagem e a densidade
+    (contagem / (n × largura)), pronta para desenhar no lugar de uma KDE.
+    """
+    valores = np.asarray(valores, dtype=float)
+    valores = valores[~np.isnan(valores)]
+    contagens, bordas = np.histogram(valores, bins=bins)
+    largura = np.diff(bordas)
+    return pd.DataFrame({
+        'inicio': bordas[:-1], 'fim': bordas[1:],
+        'centro': (bordas[:-1] + bordas[1:]) / 2,
+        'contagem': contagens,
+        'densidade': contagens / (max(len(valores), 1) * largura),
+    })
+
+
+def estatisticas_boxplot(valores, rotulo=None, max_outliers=MAX_OUTLIERS):
+    """Resumo de um boxplot no formato aceito por `Axes.bxp` do matplotlib.
+
+    Usa a regra de 1,5 × IQR para os bigodes. Quando há mais outliers que
+    `max_outliers`, ficam os mais extremos de cada lado.
+    """
+    valores = np.asarray(valores, dtype=float)
+    valores = valores[~np.isnan(valores)]
+    q1, mediana, q3 = np.percentile(valores, [25, 50, 75])
+    iqr = q3 - q1
+    dentro = valores[(valores >= q1 - 1.5 * iqr) & (valores <= q3 + 1.5 * iqr)]
+    outliers = np.sort(valores[(valores < q1 - 1.5 * iqr) | (valores > q3 + 1.5 * iqr)])
+    if len(outliers) > max_outliers:
+        metade = max_outliers // 2
+        outliers = np.concatenate([outliers[:metade], outliers[-metade:]])
+    return {
+        'label': rotulo,
+        'med': mediana, 'q1': q1, 'q3': q3,
+        'whislo': dentro.min() if len(dentro) else q1,
+        'whishi': dentro.max() if len(dentro) else q3,
+        'mean': valores.mean(),
+        'fliers': outliers,
+    }
@@ -0,0 +1,125 @@
+"""Conversão de Valor_Pedido para reais no carregamento da base.
+
+As cotações ficam em um arquivo local (`cotacoes.csv`, ao lado da planilha)
+com as colunas `Data`, `Moeda` e `Taxa_BRL` (quantos reais vale uma unidade
+da moeda naquela data). Cada pedido usa a cotação mais recente da sua moeda
+com data até a data do pedido; pedidos anteriores à primeira cotação usam a
+primeira disponível. `avisar_moedas` informa nas páginas os pedidos que
+ficaram fora de reais e os que usaram cotação retroativa.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+ARQUIVO_COTACOES = "cotacoes.csv"
+MOEDA_BASE = "BRL"
+
+
+def carregar_cotacoes(caminho=ARQUIVO_COTACOES):
+    """Lê a tabela de cotações; sem arquivo, devolve uma tabela vazia."""
+    if not os.path.exists(caminho):
+        return pd.DataFrame(columns=['Data', 'Moeda', 'Taxa_BRL'])
+    cotacoes = pd.read_csv(caminho, parse_dates=['Data'])
+    cotacoes['Moeda'] = cotacoes['Moeda'].str.strip().str.upper()
+    return cotacoes.dropna().sort_values(['Moeda', 'Data'], ignore_index=True)
+
+
+def taxas_por_pedido(moedas, datas, cotacoes):
+    """Taxa de conversão para cada pedido, por busca binária nas datas.
+
+    Moeda base e moeda ausente usam taxa 1; moedas sem nenhuma cotação e
+    pedidos sem data ficam com NaN, para que o valor não seja somado como se
+    já estivesse em reais.
+    """
+    moedas = moedas.astype('string').str.strip().str.upper()
+    datas = datas.to_numpy(dtype='datetime64[ns]')
+    taxas = np.where(moedas.isna() | (moedas == MOEDA_BASE), 1.0, np.nan)
+
+    for moeda, tabela in cotacoes.groupby('Moeda'):
+        if moeda == MOEDA_BASE:
+            continue
+        linhas = (moedas == moeda).fillna(False).to_numpy()
+        if not linhas.any():
+            continue
+        datas_tabela = tabela['Data'].to_numpy(dtype='datetime64[ns]')
+        datas_pedidos = datas[linhas]
+        posicao = np.searchsorted(datas_tabela, datas_pedidos, side='right') - 1
+        convertidas = tabela['Taxa_BRL'].to_numpy(dtype=float)[np.clip(posicao, 0, None)]
+        # NaT fica depois de todas as datas no searchsorted: sem data, sem cotação
+        taxas[linhas] = np.where(np.isnat(datas_pedidos), np.nan, convertidas)
+    return taxas
+
+
+def normalizar_moeda(df, cotacoes):
+    """Converte Valor_Pedido para reais e guarda o valor original.
+
+    Sem tabela de cotações a base é devolvida sem alterações; use
+    `diagnostico_moedas` para saber se sobrou algum valor fora de reais. Como
+    a conversão acontece no carregamento, médias, ICs e testes das páginas já
+    operam em reais.
+    """
+    if cotacoes.empty or 'Moeda' not in df.columns:
+        return df
+    taxas = taxas_por_pedido(df['Moeda'], df['Data_Pedido'], cotacoes)
+    return df.assign(
+        Valor_Original=df['Valor_Pedido'],
+        Moeda_Original=df['Moeda'],
+        Valor_Pedido=df['Valor_Pedido'] * taxas,
+        Moeda=np.where(np.isnan(taxas), df['Moeda'], MOEDA_BASE),
+    )
+
+
+def diagnostico_moedas(df, cotacoes):
+    """Pedidos em outras moedas por motivo de aviso, uma linha por moeda.
+
+    Colunas: sem_cotacao (a moeda não tem nenhuma cotação), sem_data (a moeda
+    tem cotações, mas o pedido não tem Data_Pedido) e cotacao_retroativa
+    (convertido com a primeira cotação, posterior à data do pedido). Aceita a
+    base antes ou depois de `normalizar_moeda`.
+    """
+    colunas = ['sem_cotacao', 'sem_data', 'cotacao_retroativa']
+    coluna = 'Moeda_Original' if 'Moeda_Original' in df.columns else 'Moeda'
+    if coluna not in df.columns:
+        return pd.DataFrame(columns=colunas, dtype=int)
+    moedas = df[coluna].astype('string').str.strip().str.upper()
+    estrangeira = (moedas.notna() & (moedas != MOEDA_BASE)).fillna(False)
+    primeira = moedas.map(cotacoes.groupby('Moeda')['Data'].min()).astype('datetime64[ns]')
+    sem_data = df['Data_Pedido'].isna()
+
+    situacoes = pd.DataFrame({
+        'sem_cotacao': estrangeira & primeira.isna(),
+        'sem_data': estrangeira & primeira.notna() & sem_data,
+        'cotacao_retroativa': estrangeira & (df['Data_Pedido'] < primeira),
+    })
+    contagens = situacoes[estrangeira].groupby(moedas[estrangeira]).sum()
+    return contagens[contagens.sum(axis=1) > 0].astype(int)
+
+
+def avisar_moedas(df, avisar, cotacoes=None):
+    """Chama `avisar(texto)` uma vez por motivo de aviso (ex.: `st.warning`).
+
+    Único ponto usado pelas páginas, para que todas exibam o mesmo alerta.
+    """
+    if cotacoes is None:
+        cotacoes = carregar_cotacoes()
+    diagnostico = diagnostico_moedas(df, cotacoes)
+
+    def lista(coluna):
+        contagem = diagnostico[coluna][diagnostico[coluna] > 0]
+        return ", ".join(f"{moeda} ({qtd:,})" for moeda, qtd in contagem.items())
+
+    if diagnostico.empty:
+        return
+    if diagnostico['sem_cotacao'].any():
+        destino = ("foram somados como se já estivessem em R$" if cotacoes.empty
+                   else "ficaram vazios e não entram em médias e testes")
+        avisar(f"⚠️ Pedidos em moedas sem cotação em `{ARQUIVO_COTACOES}`: {lista('sem_cotacao')}. "
+               f"Os valores desses pedidos {destino}; adicione as cotações para convertê-los.")
+    if diagnostico['sem_data'].any():
+        avisar(f"⚠️ Pedidos em outras moedas sem data do pedido: {lista('sem_data')}. "
+               "Sem data não há cotação aplicável, então esses valores ficaram sem conversão para R$.")
+    if diagnostico['cotacao_retroativa'].any():
+        avisar(f"ℹ️ Pedidos anteriores à primeira cotação da moeda: {lista('cotacao_retroativa')}. "
+               "Foram convertidos com a primeira cotação disponível, posterior à data do pedido.")
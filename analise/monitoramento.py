@@ -0,0 +1,113 @@
+"""Intervalos para a taxa de cancelamento e monitoramento sequencial."""
+
+import numpy as np
+import scipy.stats as stats
+
+METODOS_INTERVALO = ("Wald", "Wilson", "Clopper-Pearson")
+
+# Rótulos usados na página de intervalos para comparar o IC com a meta
+CRITICO = "Crítico"
+ATENCAO = "Atenção"
+DENTRO_DA_META = "Dentro da Meta"
+
+
+def intervalo_proporcao(sucessos, total, confianca=0.95, metodo="Wald"):
+    """IC bilateral para uma proporção pelo método escolhido.
+
+    Aceita escalares ou arrays (um intervalo por grupo); total zero gera NaN.
+    """
+    if metodo not in METODOS_INTERVALO:
+        raise ValueError(f"Método de intervalo desconhecido: {metodo}")
+    sucessos = np.asarray(sucessos, dtype=float)
+    total = np.asarray(total, dtype=float)
+    z = stats.norm.ppf((1 + confianca) / 2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_hat = sucessos / total
+        if metodo == "Wald":
+            margem = z * np.sqrt(p_hat * (1 - p_hat)) / np.sqrt(total)
+            inferior, superior = p_hat - margem, p_hat + margem
+        elif metodo == "Wilson":
+            denominador = 1 + z**2 / total
+            centro = (p_hat + z**2 / (2 * total)) / denominador
+            margem = z * np.sqrt(p_hat * (1 - p_hat) / total + z**2 / (4 * total**2)) / denominador
+            inferior, superior = centro - margem, centro + margem
+        else:
+            alpha = 1 - confianca
+            inferior = np.where(sucessos > 0,
+                                stats.beta.ppf(alpha / 2, sucessos, total - sucessos + 1), 0.0)
+            superior = np.where(sucessos < total,
+                                stats.beta.ppf(1 - alpha / 2, sucessos + 1, total - sucessos), 1.0)
+
+    vazio = total <= 0
+    inferior = np.where(vazio, np.nan, inferior)
+    superior = np.where(vazio, np.nan, superior)
+    # Escalares voltam como escalares para uso direto nas métricas das páginas
+    return (inferior[()], superior[()])
+
+
+def classificar_alerta(ic_min, ic_max, meta=0.10):
+    """Crítico se todo o IC está acima da meta, Dentro da Meta se está abaixo."""
+    if ic_min > meta:
+        return CRITICO
+    if ic_max <= meta:
+        return DENTRO_DA_META
+    return ATENCAO
+
+
+class MonitorCancelamento:
+    """Acompanha a taxa de cancelamento conforme novos lotes de pedidos chegam.
+
+    Cada chamada a `atualizar` custa O(1): guardamos apenas o total de pedidos,
+    o total de cancelados e os limites acumulados da sequência de confiança.
+    A sequência usa a fronteira de mistura normal (Howard et al., 2021) para
+    variáveis sub-gaussianas com variância 1/4, válida simultaneamente em
+    todos os instantes: podemos olhar o resultado após cada lote sem inflar o
+    erro tipo I, ao contrário de recalcular um IC de Wald a cada lote.
+    """
+
+    def __init__(self, meta=0.10, confianca=0.95, n_otimo=1000):
+        self.meta = meta
+        self.confianca = confianca
+        alpha = 1 - confianca
+        # Parâmetro da mistura ajustado para ser mais estreito perto de n_otimo
+        log_alpha = 2 * np.log(1 / alpha)
+        self._rho = (n_otimo / 4) / (log_alpha + np.log(1 + log_alpha))
+        self._alpha = alpha
+        self.total = 0
+        self.cancelados = 0
+        self.cs_min = 0.0
+        self.cs_max = 1.0
+
+    @property
+    def proporcao(self):
+        return self.cancelados / self.total if self.total else np.nan
+
+    def _raio_sequencia(self):
+        v = self.total / 4 + self._rho
+        return np.sqrt(v * np.log(v / (self._rho * self._alpha**2))) / self.total
+
+    def atualizar(self, novos_pedidos, novos_cancelados):
+        """Incorpora um lote e devolve o estado atual (ver `estado`)."""
+        self.total += int(novos_pedidos)
+        self.cancelados += int(novos_cancelados)
+        if self.total:
+            raio = self._raio_sequencia()
+            # Interseção com os limites anteriores continua válida e nunca alarga
+            self.cs_min = max(self.cs_min, self.proporcao - raio)
+            self.cs_max = min(self.cs_max, self.proporcao + raio)
+        return self.estado()
+
+    def intervalo(self, metodo="Wilson"):
+        """IC pontual (não sequencial) com os totais acumulados até agora."""
+        return intervalo_proporcao(self.cancelados, self.total, self.confianca, metodo)
+
+    def estado(self):
+        return {
+            'total': self.total,
+            'cancelados': self.cancelados,
+            'proporcao': self.proporcao,
+            'cs_min': self.cs_min,
+            'cs_max': self.cs_max,
+            'alerta': classificar_alerta(self.cs_min, self.cs_max, self.meta),
+        }
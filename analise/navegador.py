@@ -0,0 +1,87 @@
+"""Navegação paginada da base inteira, com ordenação e filtros no servidor."""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+TAMANHOS_PAGINA = (25, 50, 100, 250)
+
+
+class NavegadorTabela:
+    """Ordena, filtra e pagina a base sem enviar todas as linhas ao navegador.
+
+    Cada coluna vira uma chave numérica (códigos ordenados para texto) e a
+    ordem de cada coluna é calculada uma vez, na primeira vez que é pedida.
+    Depois disso, trocar de página só materializa as linhas visíveis.
+    """
+
+    def __init__(self, df):
+        self._df = df.reset_index(drop=True)
+        self.colunas = list(self._df.columns)
+        self._chaves = {}
+        self._ordens = {}
+        self._trava = threading.Lock()
+
+    def __len__(self):
+        return len(self._df)
+
+    def _chave(self, coluna):
+        # Valores faltantes viram NaN e ficam sempre no fim da ordenação
+        if coluna not in self._chaves:
+            serie = self._df[coluna]
+            if pd.api.types.is_datetime64_any_dtype(serie):
+                chave = serie.to_numpy().astype('datetime64[ns]').astype(np.int64).astype(float)
+                chave[serie.isna().to_numpy()] = np.nan
+            elif pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+                chave = serie.to_numpy(dtype=float, na_value=np.nan)
+            else:
+                codigos = pd.Categorical(serie.astype('string')).codes.astype(float)
+                codigos[codigos < 0] = np.nan
+                chave = codigos
+            self._chaves[coluna] = chave
+        return self._chaves[coluna]
+
+    def ordem(self, coluna, crescente=True):
+        """Índices das linhas ordenadas pela coluna (faltantes no fim)."""
+        with self._trava:
+            if coluna not in self._ordens:
+                self._ordens[coluna] = np.argsort(self._chave(coluna), kind='stable')
+            ordem = self._ordens[coluna]
+            validos = np.count_nonzero(~np.isnan(self._chaves[coluna]))
+        if crescente:
+            return ordem
+        return np.concatenate([ordem[:validos][::-1], ordem[validos:]])
+
+    def mascara(self, filtros):
+        """Máscara booleana dos filtros.
+
+        `filtros` mapeia coluna -> lista de valores aceitos ou tupla (mínimo,
+        máximo) para colunas numéricas e de data. Filtros vazios são ignorados.
+        """
+        mascara = np.ones(len(self._df), dtype=bool)
+        for coluna, criterio in filtros.items():
+            if criterio is None or len(criterio) == 0:
+                continue
+            serie = self._df[coluna]
+            if isinstance(criterio, tuple):
+                minimo, maximo = criterio
+                if pd.api.types.is_datetime64_any_dtype(serie):
+                    minimo, maximo = pd.to_datetime(minimo), pd.to_datetime(maximo)
+                mascara &= (serie >= minimo).to_numpy() & (serie <= maximo).to_numpy()
+            else:
+                mascara &= serie.isin(list(criterio)).to_numpy()
+        return mascara
+
+    def indices(self, filtros=None, ordenar_por=None, crescente=True):
+        """Linhas que passam nos filtros, na ordem pedida."""
+        mascara = self.mascara(filtros or {})
+        if ordenar_por is None:
+            return np.flatnonzero(mascara)
+        ordem = self.ordem(ordenar_por, crescente)
+        return ordem[mascara[ordem]]
+
+    def pagina(self, indices, numero, tamanho=TAMANHOS_PAGINA[0]):
+        """Apenas as linhas da página `numero` (começando em 1)."""
+        inicio = (numero - 1) * tamanho
+        return self._df.iloc[indices[inicio:inicio + tamanho]]
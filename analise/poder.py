@@ -0,0 +1,163 @@
+"""Poder estatístico e tamanho de amostra para os testes da página 5.
+
+As fórmulas fechadas cobrem todos os pares de categorias de uma vez; a
+validação por Monte Carlo simula diretamente as estatísticas suficientes
+(médias, variâncias e tabelas) e roda em um pool de processos criado uma
+única vez por processo e reaproveitado entre execuções da página.
+"""
+
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import scipy.optimize as optimize
+import scipy.stats as stats
+
+SIMULACOES_PADRAO = 20_000
+
+
+def momentos_por_categoria(df):
+    """n, média e variância de Valor_Pedido por categoria (uma passada)."""
+    return (df.dropna(subset=['Valor_Pedido'])
+            .groupby('Categoria')['Valor_Pedido']
+            .agg(n='count', media='mean', variancia='var'))
+
+
+def poder_welch_pares(momentos, efeito, alpha=0.05, poder_desejado=0.8):
+    """Poder do t-test de Welch e n necessário para todos os pares de categorias.
+
+    `efeito` é a diferença de médias (em R$) que se deseja detectar. O poder
+    usa a distribuição t não central com os graus de liberdade de Welch; o n
+    necessário (por grupo, grupos de mesmo tamanho) usa a aproximação normal
+    n = (z₁₋α/₂ + z_poder)² (s₁² + s₂²) / efeito².
+    """
+    m = momentos[momentos['n'] >= 2]
+    pares = list(combinations(m.index, 2))
+    if not pares:
+        return pd.DataFrame()
+    a, b = (m.loc[[p[i] for p in pares]] for i in (0, 1))
+    n1, n2 = a['n'].to_numpy(float), b['n'].to_numpy(float)
+    v1, v2 = a['variancia'].to_numpy(), b['variancia'].to_numpy()
+
+    erro_padrao = np.sqrt(v1 / n1 + v2 / n2)
+    gl = erro_padrao**4 / ((v1 / n1)**2 / (n1 - 1) + (v2 / n2)**2 / (n2 - 1))
+    t_critico = stats.t.ppf(1 - alpha / 2, gl)
+    nao_central = efeito / erro_padrao
+    poder = stats.nct.sf(t_critico, gl, nao_central) + stats.nct.cdf(-t_critico, gl, nao_central)
+
+    diferenca = a['media'].to_numpy() - b['media'].to_numpy()
+    t_obs = diferenca / erro_padrao
+    z = stats.norm.ppf(1 - alpha / 2) + stats.norm.ppf(poder_desejado)
+
+    return pd.DataFrame({
+        'categoria_a': a.index, 'categoria_b': b.index,
+        'n_a': n1.astype(int), 'n_b': n2.astype(int),
+        'diferenca': diferenca,
+        'p_valor': 2 * stats.t.sf(np.abs(t_obs), gl),
+        'poder': poder,
+        'n_necessario': np.ceil(z**2 * (v1 + v2) / efeito**2).astype(int),
+    })
+
+
+def poder_qui_quadrado(n, gl, w, alpha=0.05):
+    """Poder do qui-quadrado para o tamanho de efeito w de Cohen."""
+    critico = stats.chi2.ppf(1 - alpha, gl)
+    return stats.ncx2.sf(critico, gl, n * w**2)
+
+
+def n_qui_quadrado(gl, w, alpha=0.05, poder_desejado=0.8):
+    """Total de pedidos necessário para detectar o efeito w com o poder desejado."""
+    critico = stats.chi2.ppf(1 - alpha, gl)
+    # Parâmetro de não centralidade λ que atinge o poder; n = λ / w²
+    lam = optimize.brentq(lambda l: stats.ncx2.sf(critico, gl, l) - poder_desejado, 1e-6, 1e5)
+    return int(np.ceil(lam / w**2))
+
+
+def efeito_w(contingencia):
+    """w de Cohen observado em uma tabela de contingência: √(χ² / n)."""
+    chi2 = stats.chi2_contingency(contingencia, correction=False)[0]
+    return np.sqrt(chi2 / contingencia.to_numpy().sum())
+
+
+# ---------------------------------------------------------------------------
+# Validação por Monte Carlo
+# ---------------------------------------------------------------------------
+
+def simular_poder_welch(tarefa):
+    """Poder simulado do Welch para um par, supondo dados normais.
+
+    Média e variância amostrais são sorteadas direto das suas distribuições
+    (normal e qui-quadrado), então cada simulação custa O(1).
+    `tarefa` = (n1, v1, n2, v2, efeito, alpha, simulacoes, semente).
+    """
+    n1, v1, n2, v2, efeito, alpha, simulacoes, semente = tarefa
+    rng = np.random.default_rng(semente)
+    media1 = rng.normal(efeito, np.sqrt(v1 / n1), simulacoes)
+    media2 = rng.normal(0.0, np.sqrt(v2 / n2), simulacoes)
+    s1 = v1 * rng.chisquare(n1 - 1, simulacoes) / (n1 - 1)
+    s2 = v2 * rng.chisquare(n2 - 1, simulacoes) / (n2 - 1)
+    erro_padrao = np.sqrt(s1 / n1 + s2 / n2)
+    gl = erro_padrao**4 / ((s1 / n1)**2 / (n1 - 1) + (s2 / n2)**2 / (n2 - 1))
+    p_valor = 2 * stats.t.sf(np.abs((media1 - media2) / erro_padrao), gl)
+    return float((p_valor <= alpha).mean())
+
+
+def simular_poder_qui_quadrado(tarefa):
+    """Poder simulado do qui-quadrado sorteando tabelas multinomiais.
+
+    `tarefa` = (probabilidades das células, n, alpha, simulacoes, semente).
+    """
+    probabilidades, n, alpha, simulacoes, semente = tarefa
+    probabilidades = np.asarray(probabilidades, dtype=float)
+    rng = np.random.default_rng(semente)
+    tabelas = rng.multinomial(n, probabilidades.ravel(), simulacoes).reshape((simulacoes,) + probabilidades.shape)
+    linhas = tabelas.sum(axis=2, keepdims=True)
+    colunas = tabelas.sum(axis=1, keepdims=True)
+    esperado = linhas * colunas / n
+    with np.errstate(divide='ignore', invalid='ignore'):
+        chi2 = np.nansum((tabelas - esperado)**2 / esperado, axis=(1, 2))
+    gl = (probabilidades.shape[0] - 1) * (probabilidades.shape[1] - 1)
+    return float((chi2 > stats.chi2.ppf(1 - alpha, gl)).mean())
+
+
+# Pool compartilhado: criado na primeira simulação, encerrado na saída do processo
+_pool = None
+_trava_pool = threading.Lock()
+
+
+def _obter_pool(processos=None):
+    global _pool
+    with _trava_pool:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=processos)
+        return _pool
+
+
+def encerrar_pool():
+    """Encerra o pool de simulações; a próxima validação cria outro."""
+    global _pool
+    with _trava_pool:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(encerrar_pool)
+
+
+def validar_monte_carlo(funcao, tarefas, processos=None):
+    """Executa as simulações em paralelo, uma tarefa por processo do pool.
+
+    `processos` só vale na criação do pool; chamadas seguintes reaproveitam
+    os mesmos processos em vez de iniciar (e importar numpy/scipy) de novo.
+    """
+    try:
+        return list(_obter_pool(processos).map(funcao, tarefas))
+    except BrokenProcessPool:
+        # Um processo morreu: descarta o pool para que a próxima chamada recrie
+        encerrar_pool()
+        raise
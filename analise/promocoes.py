@@ -0,0 +1,88 @@
+"""Matriz esparsa pedido × promoção e efeito de cada promoção no valor."""
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sparse
+import scipy.stats as stats
+
+
+def matriz_promocoes(promotion_ids):
+    """Converte a coluna `Promotion IDs` em uma matriz indicadora esparsa (CSR).
+
+    Cada linha é um pedido (na ordem da série) e cada coluna uma promoção;
+    os IDs separados por vírgula são lidos uma única vez. Retorna a matriz e a
+    lista com o nome de cada coluna.
+    """
+    ids = (promotion_ids.reset_index(drop=True).astype('string')
+           .str.split(',').explode().str.strip())
+    ids = ids[ids.notna() & (ids != '')]
+    codigos, nomes = pd.factorize(ids)
+    matriz = sparse.csr_matrix(
+        (np.ones(len(codigos)), (ids.index.to_numpy(), codigos)),
+        shape=(len(promotion_ids), len(nomes)),
+    )
+    # IDs repetidos no mesmo pedido somam; a matriz deve ser apenas 0/1
+    matriz.data[:] = 1.0
+    return matriz, list(nomes)
+
+
+def _comparar_grupos(n1, s1, ss1, a1, n0, s0, ss0, a0, confianca):
+    # Compara "com" (1) e "sem" (0) a partir de contagens, somas, somas de
+    # quadrados e contagens acima do limite; funciona com arrays de grupos
+    z = stats.norm.ppf((1 + confianca) / 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media1, media0 = s1 / n1, s0 / n0
+        var1 = (ss1 - n1 * media1**2) / (n1 - 1)
+        var0 = (ss0 - n0 * media0**2) / (n0 - 1)
+
+        # Diferença de médias (Welch)
+        ep = np.sqrt(var1 / n1 + var0 / n0)
+        gl = ep**4 / ((var1 / n1)**2 / (n1 - 1) + (var0 / n0)**2 / (n0 - 1))
+        t_critico = stats.t.ppf((1 + confianca) / 2, gl)
+        uplift = media1 - media0
+
+        # Diferença em P(valor > limite)
+        p1, p0 = a1 / n1, a0 / n0
+        ep_p = np.sqrt(p1 * (1 - p1) / n1 + p0 * (1 - p0) / n0)
+
+        # Razão de variâncias com IC pela distribuição F
+        razao = var1 / var0
+        f_inf = stats.f.ppf((1 + confianca) / 2, n1 - 1, n0 - 1)
+        f_sup = stats.f.ppf((1 - confianca) / 2, n1 - 1, n0 - 1)
+
+    return {
+        'pedidos': np.asarray(n1).astype(int),
+        'ticket_com': media1, 'ticket_sem': media0,
+        'uplift_ticket': uplift,
+        'ic_uplift_min': uplift - t_critico * ep, 'ic_uplift_max': uplift + t_critico * ep,
+        'p_acima_com': p1, 'p_acima_sem': p0,
+        'uplift_p_acima': p1 - p0,
+        'ic_p_acima_min': p1 - p0 - z * ep_p, 'ic_p_acima_max': p1 - p0 + z * ep_p,
+        'razao_variancia': razao,
+        'ic_razao_min': razao / f_inf, 'ic_razao_max': razao / f_sup,
+    }
+
+
+def efeito_promocoes(matriz, nomes, valores, limite=500, confianca=0.95, min_pedidos=30):
+    """Efeito de cada promoção (e de "qualquer promoção") contra os demais pedidos.
+
+    As somas por promoção saem de um único produto esparso Xᵀ·[1, v, v², v>limite],
+    sem laço em Python sobre as promoções. Pedidos sem valor são ignorados.
+    """
+    valores = np.asarray(valores, dtype=float)
+    valido = ~np.isnan(valores)
+    v = np.where(valido, valores, 0.0)
+    colunas = np.column_stack([valido, v, v**2, valido & (v > limite)]).astype(float)
+
+    por_promocao = matriz.T @ colunas          # promoções × 4
+    totais = colunas.sum(axis=0)               # base inteira
+    com_alguma = matriz.getnnz(axis=1) > 0
+    alguma = colunas[com_alguma].sum(axis=0)
+
+    somas_com = np.vstack([alguma, por_promocao])
+    somas_sem = totais - somas_com
+    resultado = pd.DataFrame(
+        _comparar_grupos(*somas_com.T, *somas_sem.T, confianca),
+        index=pd.Index(["Qualquer promoção"] + list(nomes), name='Promoção'),
+    )
+    return resultado[resultado['pedidos'] >= min_pedidos]
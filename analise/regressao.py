@@ -0,0 +1,170 @@
+"""Regressão numérica dos resultados das páginas 4 e 5 contra valores de referência.
+
+Gera bases sintéticas fixas, roda os cálculos de `analise.estatisticas` e
+compara cada limite de IC, estatística t, p-valor, grau de liberdade e tabela
+do qui-quadrado com os valores guardados em `golden.json`, dentro de uma
+tolerância. O tempo de cada caso é medido na mesma execução.
+
+Uso:
+    python -m analise.regressao              # compara com os valores guardados
+    python -m analise.regressao --atualizar  # regrava golden.json (após revisar!)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from analise.estatisticas import ic_media, ic_cancelamento, ic_categoria, t_test_welch, qui_quadrado_entrega
+from analise.monitoramento import METODOS_INTERVALO
+
+ARQUIVO_GOLDEN = os.path.join(os.path.dirname(__file__), "golden.json")
+TOLERANCIA_RELATIVA = 1e-9
+TOLERANCIA_ABSOLUTA = 1e-12
+
+CATEGORIAS = ["Roupas", "Eletrônicos", "Casa", "Beleza"]
+STATUS = ["Enviado", "Cancelado", "Entregue", "Pendente"]
+NIVEIS = ["Padrão", "Expresso"]
+
+
+def base_sintetica(n, semente, faltantes=0.0):
+    """Base no formato da planilha, com valores que dependem da categoria."""
+    rng = np.random.default_rng(semente)
+    categoria = rng.choice(CATEGORIAS, n, p=[0.4, 0.3, 0.2, 0.1])
+    nivel = rng.choice(NIVEIS, n, p=[0.7, 0.3])
+    # Frete expresso cancela um pouco menos, para o qui-quadrado ter sinal
+    p_status = np.where(nivel[:, None] == "Expresso", [0.75, 0.08, 0.12, 0.05], [0.70, 0.15, 0.10, 0.05])
+    status = np.array(STATUS)[(rng.random(n)[:, None] > np.cumsum(p_status, axis=1)).sum(axis=1)]
+    escala = pd.Series(categoria).map({"Roupas": 250, "Eletrônicos": 420, "Casa": 300, "Beleza": 150})
+    valor = rng.gamma(2.0, escala.to_numpy())
+    valor[rng.random(n) < faltantes] = np.nan
+    return pd.DataFrame({
+        'ID_Pedido': np.arange(n),
+        'Data_Pedido': pd.Timestamp('2022-04-01') + pd.to_timedelta(rng.integers(0, 90, n), unit='D'),
+        'Status_Pedido': status,
+        'Nivel_Entrega': nivel,
+        'Categoria': categoria,
+        'Valor_Pedido': valor,
+    })
+
+
+BASES = {
+    'grande': dict(n=20_000, semente=1),
+    'media': dict(n=2_000, semente=2),
+    'pequena': dict(n=40, semente=3),
+    'com_faltantes': dict(n=2_000, semente=4, faltantes=0.1),
+}
+
+
+def _numeros(valor):
+    # Converte resultados (numpy, pandas) em listas/floats comparáveis em JSON
+    if isinstance(valor, pd.DataFrame):
+        return {'linhas': [str(i) for i in valor.index], 'colunas': [str(c) for c in valor.columns],
+                'valores': valor.to_numpy(dtype=float).tolist()}
+    if isinstance(valor, np.ndarray):
+        return valor.astype(float).tolist()
+    if isinstance(valor, (tuple, list)):
+        return [_numeros(v) for v in valor]
+    return float(valor)
+
+
+def casos(df):
+    """Cada caso é (nome, função sem argumentos que devolve um dicionário)."""
+    lista = [("ic_media", lambda: ic_media(df['Valor_Pedido']))]
+    for metodo in METODOS_INTERVALO:
+        for confianca in (0.90, 0.95, 0.99):
+            lista.append((f"ic_cancelamento/{metodo}/{confianca}",
+                          lambda m=metodo, c=confianca: ic_cancelamento(df, c, m)))
+    for categoria in CATEGORIAS:
+        lista.append((f"ic_categoria/{categoria}",
+                      lambda c=categoria: dict(zip(('ic_min', 'ic_max'), ic_categoria(df, c)[1]))))
+    for a, b in [("Roupas", "Eletrônicos"), ("Casa", "Beleza"), ("Roupas", "Casa")]:
+        def teste(a=a, b=b):
+            amostra_a = df[df['Categoria'] == a]['Valor_Pedido'].dropna()
+            amostra_b = df[df['Categoria'] == b]['Valor_Pedido'].dropna()
+            return dict(zip(('t_stat', 'p_valor', 'gl'), t_test_welch(amostra_a, amostra_b)))
+        lista.append((f"t_test/{a}x{b}", teste))
+
+    def qui_quadrado():
+        contingency, resultado = qui_quadrado_entrega(df)
+        chi2, p_chi, dof, expected = resultado
+        return {'observado': contingency, 'chi2': chi2, 'p_valor': p_chi, 'gl': dof,
+                'esperado': pd.DataFrame(expected, index=contingency.index, columns=contingency.columns)}
+    lista.append(("qui_quadrado", qui_quadrado))
+    return lista
+
+
+def executar():
+    """Roda todos os casos e devolve {base: {caso: {'valores': ..., 'segundos': ...}}}."""
+    resultados = {}
+    for nome_base, parametros in BASES.items():
+        df = base_sintetica(**parametros)
+        resultados[nome_base] = {}
+        for nome, funcao in casos(df):
+            inicio = time.perf_counter()
+            valores = funcao()
+            segundos = time.perf_counter() - inicio
+            resultados[nome_base][nome] = {
+                'valores': {chave: _numeros(v) for chave, v in valores.items()},
+                'segundos': segundos,
+            }
+    return resultados
+
+
+def _diferencas(atual, esperado, caminho):
+    # Lista de descrições das divergências entre duas estruturas aninhadas
+    if isinstance(esperado, dict):
+        if not isinstance(atual, dict) or set(atual) != set(esperado):
+            return [f"{caminho}: chaves diferentes"]
+        return [d for k in esperado for d in _diferencas(atual[k], esperado[k], f"{caminho}.{k}")]
+    if isinstance(esperado, list):
+        if not isinstance(atual, list) or len(atual) != len(esperado):
+            return [f"{caminho}: tamanhos diferentes"]
+        return [d for i, (a, e) in enumerate(zip(atual, esperado)) for d in _diferencas(a, e, f"{caminho}[{i}]")]
+    if isinstance(esperado, str):
+        return [] if atual == esperado else [f"{caminho}: {atual!r} != {esperado!r}"]
+    if np.isclose(atual, esperado, rtol=TOLERANCIA_RELATIVA, atol=TOLERANCIA_ABSOLUTA, equal_nan=True):
+        return []
+    return [f"{caminho}: {atual!r} != {esperado!r}"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--atualizar", action="store_true", help="regrava os valores de referência")
+    args = parser.parse_args(argv)
+
+    resultados = executar()
+    if args.atualizar:
+        golden = {base: {caso: r['valores'] for caso, r in casos_base.items()}
+                  for base, casos_base in resultados.items()}
+        with open(ARQUIVO_GOLDEN, "w", encoding="utf-8") as arquivo:
+            json.dump(golden, arquivo, indent=1, ensure_ascii=False)
+        print(f"Valores de referência gravados em {ARQUIVO_GOLDEN}")
+        return 0
+
+    with open(ARQUIVO_GOLDEN, encoding="utf-8") as arquivo:
+        golden = json.load(arquivo)
+
+    falhas = 0
+    for base, casos_base in resultados.items():
+        for caso, r in casos_base.items():
+            esperado = golden.get(base, {}).get(caso)
+            erros = ["sem valor de referência"] if esperado is None else \
+                _diferencas(r['valores'], esperado, caso)
+            situacao = "OK  " if not erros else "FALHA"
+            print(f"{situacao} {base:<14} {caso:<40} {r['segundos'] * 1000:8.2f} ms")
+            for erro in erros:
+                print(f"      {erro}")
+            falhas += bool(erros)
+
+    total = sum(len(c) for c in resultados.values())
+    print(f"\n{total - falhas}/{total} casos dentro da tolerância")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""Agregados diários e indicadores móveis para o modo de tendência."""
+
+import numpy as np
+import pandas as pd
+
+# Frequências aceitas na visão de tendência (rótulo exibido -> regra do pandas)
+FREQUENCIAS = {"Diária": "D", "Semanal": "W", "Mensal": "MS"}
+
+COLUNAS_DIARIAS = ['linhas', 'pedidos', 'com_valor', 'valor_total', 'cancelados']
+
+
+def agregar_diario(df):
+    """Resume os pedidos em uma tabela por dia, em uma única passada.
+
+    Colunas: linhas, pedidos (IDs distintos), com_valor (linhas com
+    Valor_Pedido preenchido), valor_total e cancelados.
+    Dias sem pedidos aparecem com zero para que as janelas sejam contínuas.
+    """
+    base = df.dropna(subset=['Data_Pedido'])
+    if base.empty:
+        return pd.DataFrame(columns=COLUNAS_DIARIAS,
+                            index=pd.DatetimeIndex([], name='Data'))
+
+    dia = base['Data_Pedido'].dt.normalize().rename('Data')
+    diario = base.assign(
+        cancelado=(base['Status_Pedido'] == 'Cancelado').astype(int)
+    ).groupby(dia).agg(
+        linhas=('Status_Pedido', 'size'),
+        pedidos=('ID_Pedido', 'nunique'),
+        com_valor=('Valor_Pedido', 'count'),
+        valor_total=('Valor_Pedido', 'sum'),
+        cancelados=('cancelado', 'sum'),
+    )
+    calendario = pd.date_range(diario.index.min(), diario.index.max(), freq='D', name='Data')
+    return diario.reindex(calendario, fill_value=0)
+
+
+def _derivar_kpis(tabela):
+    # Ticket médio e taxa de cancelamento a partir das somas do período
+    linhas = tabela['linhas'].replace(0, np.nan)
+    return tabela.assign(
+        ticket_medio=tabela['valor_total'] / tabela['com_valor'].replace(0, np.nan),
+        taxa_cancelamento=tabela['cancelados'] / linhas,
+    )
+
+
+def reamostrar(diario, frequencia="Diária"):
+    """Soma a tabela diária por dia, semana ou mês e deriva os KPIs."""
+    regra = FREQUENCIAS[frequencia]
+    tabela = diario if regra == "D" else diario.resample(regra).sum()
+    return _derivar_kpis(tabela)
+
+
+def _somas_janela(valores, janela):
+    # Soma móvel via soma acumulada: S[i] - S[i - janela], custo O(dias)
+    acumulado = np.concatenate(([0.0], np.cumsum(valores, dtype=float)))
+    somas = np.full(len(valores), np.nan)
+    if janela <= len(valores):
+        somas[janela - 1:] = acumulado[janela:] - acumulado[:-janela]
+    return somas
+
+
+def janela_movel(diario, janela=7):
+    """KPIs sobre janelas móveis de `janela` dias terminando em cada data."""
+    movel = pd.DataFrame(
+        {c: _somas_janela(diario[c].to_numpy(), janela) for c in COLUNAS_DIARIAS},
+        index=diario.index,
+    )
+    return _derivar_kpis(movel)
+
+
+def variacao_periodo(diario, dias=90):
+    """Compara os últimos `dias` dias com os `dias` imediatamente anteriores.
+
+    Retorna um dicionário com os valores atual/anterior de pedidos, ticket médio
+    e taxa de cancelamento, além da variação percentual (ou em pontos
+    percentuais, no caso da taxa). Sem histórico suficiente, a variação é None.
+    """
+    n = len(diario)
+    acumulado = {c: np.concatenate(([0.0], np.cumsum(diario[c].to_numpy(), dtype=float)))
+                 for c in COLUNAS_DIARIAS}
+
+    def somas(inicio, fim):
+        return {c: acumulado[c][fim] - acumulado[c][inicio] for c in COLUNAS_DIARIAS}
+
+    atual = somas(max(n - dias, 0), n)
+    anterior = somas(n - 2 * dias, n - dias) if n >= 2 * dias else None
+
+    def kpis(s):
+        if s is None or s['linhas'] == 0:
+            return None
+        return {
+            'pedidos': s['pedidos'],
+            'ticket_medio': s['valor_total'] / s['com_valor'] if s['com_valor'] else None,
+            'taxa_cancelamento': s['cancelados'] / s['linhas'],
+        }
+
+    k_atual, k_anterior = kpis(atual), kpis(anterior)
+    variacao = None
+    if k_atual and k_anterior:
+        variacao = {
+            'pedidos': (k_atual['pedidos'] / k_anterior['pedidos'] - 1) * 100
+            if k_anterior['pedidos'] else None,
+            'ticket_medio': (k_atual['ticket_medio'] / k_anterior['ticket_medio'] - 1) * 100
+            if k_atual['ticket_medio'] and k_anterior['ticket_medio'] else None,
+            'taxa_cancelamento': (k_atual['taxa_cancelamento'] - k_anterior['taxa_cancelamento']) * 100,
+        }
+    return {'atual': k_atual, 'anterior': k_anterior, 'variacao': variacao}
+
+
+def variacao_recente(diario, janelas=(90, 30, 7)):
+    """`variacao_periodo` na maior janela de `janelas` com dois períodos completos.
+
+    O resultado ganha a chave 'dias' com a janela usada (None se nem a menor
+    cabe duas vezes no histórico; nesse caso a variação também é None).
+    """
+    for dias in janelas:
+        if len(diario) >= 2 * dias:
+            return {**variacao_periodo(diario, dias), 'dias': dias}
+    return {**variacao_periodo(diario, janelas[-1]), 'dias': None}
@@ -1,19 +1,34 @@
 import streamlit as st
 import pandas as pd
 
+from analise.cache_compartilhado import armazem, impressao_digital, versao_dados
+from analise.moedas import carregar_cotacoes, normalizar_moeda, avisar_moedas
+from analise.navegador import NavegadorTabela, TAMANHOS_PAGINA
+
 # Função de carregamento centralizada (igual à da Home)
 @st.cache_data
 def load_data():
     df = pd.read_excel("df_selecionado.xlsx")
     df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], errors='coerce')  # Converter data
+    df = normalizar_moeda(df, carregar_cotacoes())  # Valores convertidos para R$
     return df
 
+# Navegador com as ordenações por coluna guardadas entre interações e sessões
+@st.cache_resource
+def load_navegador():
+    return NavegadorTabela(load_data())
+
+@st.cache_data
+def load_versao():
+    return versao_dados(load_data())
+
 df = load_data()  # Carrega os dados
 
 # ============ CONTEÚDO DA PÁGINA ============
 
 # Título com ícone para dar um toque visual
 st.title("📚 Base de Dados e Variáveis")
+avisar_moedas(df, st.warning)
 
 # Introdução explicativa
 st.markdown("""
@@ -89,3 +104,60 @@ st.dataframe(
         "Valor_Pedido": st.column_config.NumberColumn("💰 Valor", format="R$ %.2f")
     }
 )
+
+# Seção 4: Navegador Completo da Base
+st.subheader("🗂️ Navegador Completo da Base")
+st.markdown("""
+Explore **todos os registros** da base. A ordenação, os filtros e a paginação são feitos no servidor:
+apenas as linhas da página atual são enviadas ao navegador, então a consulta continua rápida mesmo com milhões de pedidos.
+""")
+
+navegador = load_navegador()
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    filtro_categorias = st.multiselect("Categorias", options=sorted(df['Categoria'].dropna().unique()), key="nav_categorias")
+with col2:
+    filtro_status = st.multiselect("Status do Pedido", options=sorted(df['Status_Pedido'].dropna().unique()), key="nav_status")
+with col3:
+    filtro_periodo = st.date_input("Período", [df['Data_Pedido'].min(), df['Data_Pedido'].max()], key="nav_periodo")
+
+col4, col5, col6 = st.columns(3)
+with col4:
+    ordenar_por = st.selectbox("Ordenar por", ["(ordem original)"] + navegador.colunas, key="nav_ordem")
+with col5:
+    crescente = st.radio("Sentido", ["Crescente", "Decrescente"], horizontal=True, key="nav_sentido") == "Crescente"
+with col6:
+    tamanho_pagina = st.selectbox("Linhas por página", TAMANHOS_PAGINA, key="nav_tamanho")
+
+filtros = {
+    'Categoria': filtro_categorias,
+    'Status_Pedido': filtro_status,
+    'Data_Pedido': tuple(filtro_periodo) if len(filtro_periodo) == 2 else None,
+}
+coluna_ordem = None if ordenar_por == "(ordem original)" else ordenar_por
+
+# Índices filtrados e ordenados ficam no armazém: mudar de página não refaz a consulta
+indices = armazem.obter_ou_calcular(
+    impressao_digital(load_versao(), "base_dados/navegador",
+                      filtros={'categorias': set(filtro_categorias), 'status': set(filtro_status),
+                               'periodo': filtros['Data_Pedido']},
+                      parametros={'ordenar_por': coluna_ordem, 'crescente': crescente}),
+    lambda: navegador.indices(filtros, coluna_ordem, crescente),
+)
+
+total_paginas = max(1, -(-len(indices) // tamanho_pagina))
+numero_pagina = st.number_input(f"Página (de {total_paginas:,})", min_value=1, max_value=total_paginas,
+                                value=1, step=1, key="nav_pagina")
+
+st.dataframe(
+    navegador.pagina(indices, numero_pagina, tamanho_pagina),
+    use_container_width=True,
+    column_config={
+        "Data_Pedido": st.column_config.DateColumn("📅 Data", format="DD/MM/YYYY"),
+        "Valor_Pedido": st.column_config.NumberColumn("💰 Valor", format="R$ %.2f")
+    }
+)
+inicio = (numero_pagina - 1) * tamanho_pagina
+st.caption(f"Exibindo linhas {min(inicio + 1, len(indices)):,} a {min(inicio + tamanho_pagina, len(indices)):,} "
+           f"de {len(indices):,} registros filtrados ({len(navegador):,} no total).")
@@ -3,16 +3,38 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from analise.amostragem import amostra_estratificada, estimar_resumo
+from analise.cache_compartilhado import armazem, impressao_digital, versao_dados
+from analise.distribuicoes import preordenar_por_grupo, filtrar_ordenados, teste_ks, teste_mann_whitney, curva_qq
+from analise.moedas import carregar_cotacoes, normalizar_moeda, avisar_moedas
+
 @st.cache_data
 def load_data():
     df = pd.read_excel("df_selecionado.xlsx")
     df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], errors='coerce')  # Converter data
+    df = normalizar_moeda(df, carregar_cotacoes())  # Valores convertidos para R$
     return df
 
+# Valores B2B/B2C ordenados uma única vez; os filtros apenas recortam os arrays
+@st.cache_data
+def load_b2b_ordenado():
+    return preordenar_por_grupo(load_data())
+
+# Versão da base usada nas chaves do armazém compartilhado entre sessões
+@st.cache_data
+def load_versao():
+    return versao_dados(load_data())
+
+# Amostra estratificada (Categoria × Nível de Entrega × mês) sorteada uma única vez
+@st.cache_data
+def load_amostra():
+    return amostra_estratificada(load_data())
+
 df = load_data()  # Carrega os dados
 
 # Título com ícone para atrair a atenção
 st.title("🔍 Análise Exploratória")
+avisar_moedas(df, st.warning)
 
 # Introdução explicativa
 st.markdown("""
@@ -53,57 +75,105 @@ with st.sidebar:
     date_range = st.date_input("Período", [df['Data_Pedido'].min(), df['Data_Pedido'].max()])
     categories = st.multiselect("Categorias", options=df['Categoria'].unique())
     service_levels = st.multiselect("Nível de Serviço", options=df['Nivel_Entrega'].unique())
+    modo_aproximado = st.toggle("⚡ Modo Aproximado", value=False,
+                                help="Mostra estimativas com margem de erro, calculadas sobre uma amostra estratificada. Os valores exatos só são calculados quando solicitados.")
+
+# Aplicação dos Filtros e cálculos dos KPIs e gráficos
+def calcular_resumo():
+    df_filtered = df[
+        (df['Data_Pedido'] >= pd.to_datetime(date_range[0])) &
+        (df['Data_Pedido'] <= pd.to_datetime(date_range[1]))
+    ]
+    if categories:
+        df_filtered = df_filtered[df_filtered['Categoria'].isin(categories)]
+    if service_levels:  
+        df_filtered = df_filtered[df_filtered['Nivel_Entrega'].isin(service_levels)]
+
+    # Filtro vazio: resumo sem indicadores (taxa e top categoria não existem)
+    if df_filtered.empty:
+        return {'total': 0}
+
+    return {
+        'total': len(df_filtered),
+        'media_valor': df_filtered['Valor_Pedido'].mean(),
+        'taxa_cancelamento': df_filtered[df_filtered['Status_Pedido'] == 'Cancelado'].shape[0] / df_filtered.shape[0],
+        'top_categoria': df_filtered['Categoria'].value_counts().index[0],
+        # Agrupa os produtos e soma o valor dos pedidos
+        'vendas_por_produto': df_filtered.groupby('Estilo')['Valor_Pedido'].sum().sort_values(ascending=False).head(5),
+        'status_counts': df_filtered['Status_Pedido'].value_counts(),
+    }
+
+# Mesmos filtros sobre a amostra estratificada, para o modo aproximado
+def calcular_resumo_aproximado():
+    amostra = load_amostra()
+    mascara = (
+        (amostra['Data_Pedido'] >= pd.to_datetime(date_range[0])) &
+        (amostra['Data_Pedido'] <= pd.to_datetime(date_range[1]))
+    )
+    if categories:
+        mascara &= amostra['Categoria'].isin(categories)
+    if service_levels:
+        mascara &= amostra['Nivel_Entrega'].isin(service_levels)
+    return estimar_resumo(amostra, mascara.to_numpy())
+
+# Sessões com os mesmos filtros reaproveitam o mesmo resultado
+chave_filtros = {'periodo': date_range, 'categorias': set(categories), 'niveis': set(service_levels)}
+
+# Exibição de KPIs e gráficos a partir de um resumo (exato ou aproximado)
+def mostrar_resumo(resumo):
+    # Sufixo "± margem" quando o resumo vem da amostra
+    def margem(chave, formato):
+        return f" ± {formato.format(resumo[chave])}" if chave in resumo else ""
+
+    if resumo['total'] == 0:
+        st.warning("Nenhum dado disponível após aplicação dos filtros!")
+        return
+
+    # Exibição de KPIs com explicação
+    st.markdown("### Indicadores-Chave (KPIs)")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Média de Valor do Pedido", f"R${resumo['media_valor']:.2f}" + margem('margem_media', "R${:.2f}"), 
+                help="Valor médio dos pedidos, útil para identificar ticket médio e possíveis outliers.")
+    col2.metric("Taxa de Cancelamento", 
+               f"{resumo['taxa_cancelamento'] * 100:.1f}%" + margem('margem_taxa', "{:.1%}"), 
+               help="Proporção de pedidos cancelados em relação ao total, um indicador crítico de desempenho.")
+    col3.metric("Top Categoria", 
+               resumo['top_categoria'],
+               help="A categoria com maior número de pedidos, revelando o segmento de maior demanda.")
 
-# Aplicação dos Filtros
-df_filtered = df[
-    (df['Data_Pedido'] >= pd.to_datetime(date_range[0])) &
-    (df['Data_Pedido'] <= pd.to_datetime(date_range[1]))
-]
-if categories:
-    df_filtered = df_filtered[df_filtered['Categoria'].isin(categories)]
-if service_levels:  
-    df_filtered = df_filtered[df_filtered['Nivel_Entrega'].isin(service_levels)]
-
-# Exibição de KPIs com explicação
-st.markdown("### Indicadores-Chave (KPIs)")
-col1, col2, col3 = st.columns(3)
-col1.metric("Média de Valor do Pedido", f"R${df_filtered['Valor_Pedido'].mean():.2f}", 
-            help="Valor médio dos pedidos, útil para identificar ticket médio e possíveis outliers.")
-col2.metric("Taxa de Cancelamento", 
-           f"{df_filtered[df_filtered['Status_Pedido'] == 'Cancelado'].shape[0] / df_filtered.shape[0] * 100:.1f}%", 
-           help="Proporção de pedidos cancelados em relação ao total, um indicador crítico de desempenho.")
-col3.metric("Top Categoria", 
-           df_filtered['Categoria'].value_counts().index[0],
-           help="A categoria com maior número de pedidos, revelando o segmento de maior demanda.")
-
-# Visualizações
-st.markdown("### Visualizações Interativas")
-
-# Gráfico: Produtos Mais Rentáveis
-st.subheader("📊 Produtos Mais Rentáveis")
-fig, ax = plt.subplots()
-# Agrupa os produtos e soma o valor dos pedidos
-vendas_por_produto = df_filtered.groupby('Estilo')['Valor_Pedido'].sum().sort_values(ascending=False).head(5)
-sns.barplot(
-    x=vendas_por_produto.values,
-    y=vendas_por_produto.index,
-    palette="viridis",
-    ax=ax
-)
-ax.set_title("Top 5 Produtos por Faturamento")
-ax.set_xlabel("Faturamento (R$)")
-ax.set_ylabel("Produto")
-st.pyplot(fig)
-
-# Gráfico: Distribuição de Status dos Pedidos
-st.subheader("📦 Distribuição de Status dos Pedidos")
-if not df_filtered.empty:
+    # Visualizações
+    st.markdown("### Visualizações Interativas")
+
+    # Gráfico: Produtos Mais Rentáveis
+    st.subheader("📊 Produtos Mais Rentáveis")
+    fig, ax = plt.subplots()
+    vendas_por_produto = resumo['vendas_por_produto']
+    sns.barplot(
+        x=vendas_por_produto.values,
+        y=vendas_por_produto.index,
+        palette="viridis",
+        ax=ax
+    )
+    if 'margem_vendas' in resumo:
+        ax.errorbar(x=vendas_por_produto.values, y=range(len(vendas_por_produto)),
+                    xerr=resumo['margem_vendas'].values, fmt='none', ecolor='black', capsize=4)
+    ax.set_title("Top 5 Produtos por Faturamento" + (" (estimado)" if 'margem_vendas' in resumo else ""))
+    ax.set_xlabel("Faturamento (R$)")
+    ax.set_ylabel("Produto")
+    st.pyplot(fig)
+    if 'margem_vendas' in resumo:
+        st.caption("⚠️ Os 5 maiores faturamentos estimados tendem a superestimar o valor real: "
+                   "são justamente os estilos cuja estimativa saiu mais alta na amostra (viés de seleção). "
+                   "Considere as barras de erro (IC 95%) e confira os valores exatos antes de decidir.")
+
+    # Gráfico: Distribuição de Status dos Pedidos
+    st.subheader("📦 Distribuição de Status dos Pedidos")
     fig2 = plt.figure(figsize=(10, 6))
     gs = fig2.add_gridspec(1, 2, width_ratios=[3, 1])
-    
+
     # Agrupa categorias com base no status e agrupa as menores que 5% em "Outros"
-    status_counts = df_filtered['Status_Pedido'].value_counts()
-    threshold = 0.05 * len(df_filtered)
+    status_counts = resumo['status_counts']
+    threshold = 0.05 * resumo['total']
     small_categories = status_counts[status_counts < threshold]
     if not small_categories.empty:
         main_categories = status_counts[status_counts >= threshold]
@@ -113,7 +183,7 @@ if not df_filtered.empty:
 
     ax2 = fig2.add_subplot(gs[0])
     fig2.suptitle("Distribuição de Status dos Pedidos", fontsize=14, y=0.95)
-    
+
     wedges, texts, autotexts = ax2.pie(
         main_categories,
         labels=main_categories.index,
@@ -125,7 +195,7 @@ if not df_filtered.empty:
     )
     plt.setp(texts, size=10, rotation_mode="anchor", ha="center", va="center")
     plt.setp(autotexts, size=9, weight="bold", color="white")
-    
+
     # Legenda externa
     ax2.legend(
         wedges,
@@ -134,5 +204,63 @@ if not df_filtered.empty:
         bbox_to_anchor=(1, 0, 1, 1)
     )
     st.pyplot(fig2)
+    if 'margem_status' in resumo:
+        st.caption("Margens de erro (95%) das proporções estimadas: " + ", ".join(
+            f"{status}: ±{m * 100:.1f} p.p." for status, m in resumo['margem_status'].items()))
+
+# No modo aproximado a base completa só é percorrida quando o usuário pede,
+# em uma nova execução da página disparada pelo botão
+if modo_aproximado and not st.button("🎯 Calcular valores exatos",
+                                     help="Recalcula os indicadores sobre a base completa com os filtros atuais."):
+    st.info("⚡ Resultados aproximados a partir de uma amostra estratificada.")
+    mostrar_resumo(armazem.obter_ou_calcular(
+        impressao_digital(load_versao(), "analise_exploratoria/aproximado", filtros=chave_filtros),
+        calcular_resumo_aproximado,
+    ))
 else:
-    st.warning("Nenhum dado disponível após aplicação dos filtros!")
+    mostrar_resumo(armazem.obter_ou_calcular(
+        impressao_digital(load_versao(), "analise_exploratoria", filtros=chave_filtros),
+        calcular_resumo,
+    ))
+
+# Comparação B2B x B2C
+st.subheader("🏢 Distribuição de Valores: B2B x B2C")
+st.markdown("Pedidos B2B têm distribuição de valores diferente de B2C? Comparamos as duas distribuições com os filtros aplicados.")
+
+b2b_ordenado = load_b2b_ordenado()
+valores_b2b = filtrar_ordenados(b2b_ordenado, "B2B", date_range[0], date_range[1], categories, service_levels)
+valores_b2c = filtrar_ordenados(b2b_ordenado, "B2C", date_range[0], date_range[1], categories, service_levels)
+
+if len(valores_b2b) < 2 or len(valores_b2c) < 2:
+    st.warning("São necessários pelo menos 2 pedidos B2B e 2 pedidos B2C com os filtros atuais.")
+else:
+    d_ks, p_ks = teste_ks(valores_b2b, valores_b2c)
+    u_mw, p_mw = teste_mann_whitney(valores_b2b, valores_b2c)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Pedidos B2B", f"{len(valores_b2b):,}")
+    col2.metric("Pedidos B2C", f"{len(valores_b2c):,}")
+    col3.metric("p-valor KS", f"{p_ks:.3f}",
+                help="Kolmogorov-Smirnov: compara as distribuições inteiras (forma, posição e dispersão).")
+    col4.metric("p-valor Mann-Whitney", f"{p_mw:.3f}",
+                help="Mann-Whitney: verifica se valores de um grupo tendem a ser maiores que os do outro.")
+
+    # Gráfico Q-Q: pontos acima da diagonal indicam valores B2B maiores no mesmo quantil
+    qq = curva_qq(valores_b2c, valores_b2b)
+    fig3, ax3 = plt.subplots(figsize=(6, 6))
+    ax3.plot(qq['quantil_x'], qq['quantil_y'], 'o', color='#3498db', markersize=4)
+    limites = [min(qq['quantil_x'].min(), qq['quantil_y'].min()), max(qq['quantil_x'].max(), qq['quantil_y'].max())]
+    ax3.plot(limites, limites, '--', color='gray', label='Distribuições iguais')
+    ax3.set_xlabel("Quantis B2C (R$)")
+    ax3.set_ylabel("Quantis B2B (R$)")
+    ax3.set_title("Gráfico Q-Q: B2B x B2C")
+    ax3.legend()
+    st.pyplot(fig3)
+
+    alpha = 0.05
+    if p_ks <= alpha or p_mw <= alpha:
+        st.markdown(f"**Há diferença significativa** (p≤{alpha}) entre as distribuições de valores B2B e B2C.")
+        st.markdown("💡 Conclusão de negócio: vale tratar B2B como segmento próprio em preços, promoções e metas de ticket.")
+    else:
+        st.markdown(f"**Não há evidência de diferença** (p>{alpha}) entre as distribuições de valores B2B e B2C.")
+        st.markdown("💡 Conclusão de negócio: os dois canais podem seguir a mesma estratégia de preços.")
@@ -1,19 +1,47 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import scipy.stats as stats
 import matplotlib.pyplot as plt
-import seaborn as sns
+import scipy.stats as stats
+
+from analise.cache_compartilhado import armazem, impressao_digital, versao_dados
+from analise.estatisticas import ic_media, ic_cancelamento, ic_categoria
+from analise.graficos import histograma, lttb
+from analise.moedas import carregar_cotacoes, normalizar_moeda, avisar_moedas
+from analise.monitoramento import (METODOS_INTERVALO, CRITICO, DENTRO_DA_META,
+                                   classificar_alerta, MonitorCancelamento)
+from analise.serie_temporal import agregar_diario
 
 @st.cache_data
 def load_data():
     df = pd.read_excel("df_selecionado.xlsx")
     df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], errors='coerce')
+    df = normalizar_moeda(df, carregar_cotacoes())  # Valores convertidos para R$
     return df
 
+# Versão da base usada nas chaves do armazém compartilhado entre sessões
+@st.cache_data
+def load_versao():
+    return versao_dados(load_data())
+
+# Lotes diários para o monitoramento sequencial
+@st.cache_data
+def load_diario():
+    return agregar_diario(load_data())
+
+# Reproduz os lotes diários no monitor, como se os pedidos chegassem em sequência
+@st.cache_data
+def load_monitoramento(meta, confianca):
+    diario = load_diario()
+    monitor = MonitorCancelamento(meta=meta, confianca=confianca)
+    estados = [monitor.atualizar(linhas, cancelados)
+               for linhas, cancelados in zip(diario['linhas'], diario['cancelados'])]
+    return pd.DataFrame(estados, index=diario.index)
+
 df = load_data()
 
 st.title("📊 Análise com Intervalos de Confiança")
+avisar_moedas(df, st.warning)
 st.markdown("---")
 
 # ========================================================================
@@ -52,7 +80,8 @@ analise = st.sidebar.selectbox(
     "Escolha o Tipo de Análise:",
     ("Média de Valor dos Pedidos", 
      "Proporção de Pedidos Cancelados",
-     "Comparação entre Categorias")
+     "Comparação entre Categorias",
+     "Monitoramento Sequencial de Cancelamentos")
 )
 
 # ========================================================================
@@ -100,13 +129,9 @@ if analise == "Média de Valor dos Pedidos":
     # Cálculos
     sample = df['Valor_Pedido'].dropna()
     confidence_level = 0.95
-    n = len(sample)
-    sample_mean = np.mean(sample)
-    sample_std = np.std(sample, ddof=1)
-    t_critical = stats.t.ppf((1 + confidence_level)/2, df=n-1)
-    margin_of_error = t_critical * (sample_std / np.sqrt(n))
-    ic_min = sample_mean - margin_of_error
-    ic_max = sample_mean + margin_of_error
+    resultado = ic_media(sample, confidence_level)
+    sample_mean, sample_std = resultado['media'], resultado['desvio']
+    ic_min, ic_max = resultado['ic_min'], resultado['ic_max']
     
     # Resultados Numéricos
     st.subheader("📊 Resultados Numéricos")
@@ -119,8 +144,10 @@ if analise == "Média de Valor dos Pedidos":
     st.subheader("📈 Visualização do Intervalo")
     fig, ax = plt.subplots(figsize=(10, 5))
     
-    # Plot da distribuição com densidade
-    sns.kdeplot(sample, ax=ax, color='#3498db', linewidth=2, fill=True, alpha=0.2)
+    # Plot da distribuição com densidade (histograma de faixas fixas: custo constante para qualquer n)
+    bins = histograma(sample)
+    ax.stairs(bins['densidade'], np.append(bins['inicio'].to_numpy(), bins['fim'].iloc[-1]),
+              color='#3498db', linewidth=2, fill=True, alpha=0.2)
     
     # Área do Intervalo de Confiança
     ax.axvspan(ic_min, ic_max, color='#e74c3c', alpha=0.2, label='IC 95%')
@@ -154,10 +181,17 @@ if analise == "Média de Valor dos Pedidos":
 elif analise == "Proporção de Pedidos Cancelados":
     st.header("2. Intervalo de Confiança para Proporção de Cancelamentos")
     
-    # Cálculo das Variáveis
-    cancelados = df[df['Status_Pedido'] == 'Cancelado'].shape[0]
-    total = df.shape[0]
-    p_hat = cancelados / total  # Proporção amostral
+    # Permite ajuste interativo do nível de confiança para a proporção
+    confidence_level = st.slider("Nível de Confiança", 0.80, 0.99, 0.95, key="cancel_slider")
+    metodo = st.radio("Método do Intervalo", METODOS_INTERVALO, horizontal=True,
+                      help="Wilson e Clopper-Pearson mantêm a cobertura mesmo com proporções pequenas.")
+    
+    # Cálculo das Variáveis: contagens e intervalo saem da mesma chamada
+    resultado = ic_cancelamento(df, confidence_level, metodo)
+    cancelados, total = resultado['cancelados'], resultado['total']
+    p_hat = resultado['p_hat']  # Proporção amostral
+    ic_min, ic_max = resultado['ic_min'], resultado['ic_max']
+    alerta = classificar_alerta(ic_min, ic_max, meta=0.10)
     
     # Apresentação da Variável
     with st.expander("🔍 Variável Utilizada", expanded=True):
@@ -167,37 +201,48 @@ elif analise == "Proporção de Pedidos Cancelados":
         | `Status_Pedido` | Categórica | Status do pedido                  | {cancelados} Cancelados<br>{total - cancelados} Concluídos |
         """, unsafe_allow_html=True)
     
-    # Fundamentação Teórica
+    # Fundamentação Teórica: fórmula e valor crítico do método e nível escolhidos
+    nivel = f"{confidence_level:.0%}"
+    z = stats.norm.ppf((1 + confidence_level) / 2)
+    if metodo == "Wald":
+        pressupostos = rf"""- Condição de normalidade (exigida pelo Wald):  
+          - `n * p̂ = {cancelados}` ≥ 10 {"✅" if cancelados >= 10 else "❌"}  
+          - `n * (1 - p̂) = {total - cancelados}` ≥ 10 {"✅" if total - cancelados >= 10 else "❌"}"""
+        formula = r"IC = \hat{p} \pm Z_{\alpha/2} \times \sqrt{\frac{\hat{p}(1-\hat{p})}{n}}"
+    elif metodo == "Wilson":
+        pressupostos = "- Não depende da aproximação normal de p̂ (cobertura estável com p̂ pequeno) ✅"
+        formula = (r"IC = \frac{\hat{p} + \frac{Z_{\alpha/2}^2}{2n}}{1 + \frac{Z_{\alpha/2}^2}{n}}"
+                   r" \pm \frac{Z_{\alpha/2}}{1 + \frac{Z_{\alpha/2}^2}{n}}"
+                   r" \sqrt{\frac{\hat{p}(1-\hat{p})}{n} + \frac{Z_{\alpha/2}^2}{4n^2}}")
+    else:
+        pressupostos = "- Intervalo exato pela distribuição binomial, sem aproximação normal ✅"
+        formula = (r"IC = \left[ B\left(\tfrac{\alpha}{2};\ x,\ n-x+1\right),\ "
+                   r"B\left(1-\tfrac{\alpha}{2};\ x+1,\ n-x\right) \right]")
+    if metodo == "Clopper-Pearson":
+        termos = rf"""- $B(q;\ a,\ b)$ = quantil $q$ da distribuição Beta, com $\alpha$ = {1 - confidence_level:.2f}
+        - $x$ = {cancelados} (pedidos cancelados)"""
+    else:
+        termos = rf"- $Z_{{\alpha/2}}$ = {z:.3f} (para {nivel} de confiança)"
+
     with st.expander("📚 Fundamentação Estatística", expanded=True):
         st.markdown(f"""
         **Objetivo:**  
-        Estimar a verdadeira taxa de cancelamentos com 95% de confiança.
+        Estimar a verdadeira taxa de cancelamentos com {nivel} de confiança (método **{metodo}**).
         
         **Pressupostos Validados:**
         - Amostra aleatória e independente ✅  
-        - Condição de normalidade:  
-          - `n * p̂ = {cancelados}` ≥ 10 ✅  
-          - `n * (1 - p̂) = {total - cancelados}` ≥ 10 ✅
+        {pressupostos}
         
         **Fórmula Utilizada:**  
         """)
-        st.latex(r'''
-        IC = \hat{p} \pm Z_{\alpha/2} \times \sqrt{\frac{\hat{p}(1-\hat{p})}{n}}
-        ''')
-        st.markdown(f"""
+        st.latex(formula)
+        st.markdown(rf"""
         Onde:
         - $\hat{{p}}$ = {p_hat:.4f} (proporção amostral)
-        - $Z_{{alpha/2}}$ = 1.96 (para 95% de confiança)
+        {termos}
         - $n$ = {total}
         """)
     
-    # Permite ajuste interativo do nível de confiança para a proporção
-    confidence_level = st.slider("Nível de Confiança", 0.80, 0.99, 0.95, key="cancel_slider")
-    z_critical = stats.norm.ppf((1 + confidence_level) / 2)
-    margin_of_error = z_critical * np.sqrt(p_hat * (1 - p_hat)) / np.sqrt(total)
-    ic_min = p_hat - margin_of_error
-    ic_max = p_hat + margin_of_error
-    
     # Visualização
     st.subheader("📊 Visualização do Intervalo")
     fig, ax = plt.subplots(figsize=(8, 3))
@@ -234,9 +279,9 @@ elif analise == "Proporção de Pedidos Cancelados":
     
     **Implicações Operacionais:**
     {"- ❌ **Crítico:** O limite inferior está acima da meta de 10% → Ação imediata necessária" 
-     if ic_min > 0.10 else 
+     if alerta == CRITICO else 
      "- ✅ **Dentro da Meta:** O intervalo está compatível com os objetivos estratégicos" 
-     if ic_max <= 0.10 else 
+     if alerta == DENTRO_DA_META else 
      "- ⚠️ **Atenção:** O limite superior excede a meta → Monitoramento necessário"}
     
     **Ações Recomendadas:**
@@ -248,7 +293,7 @@ elif analise == "Proporção de Pedidos Cancelados":
 # ========================================================================
 # Análise 3: Comparação entre Categorias
 # ========================================================================
-else:
+elif analise == "Comparação entre Categorias":
     st.header("3. Comparação de Médias entre Categorias")
     
     # Seleção Interativa
@@ -275,15 +320,23 @@ else:
         ''')
     
     # Dados e Cálculos
-    dados_cat1 = df[df['Categoria'] == categoria1]['Valor_Pedido'].dropna()
-    dados_cat2 = df[df['Categoria'] == categoria2]['Valor_Pedido'].dropna()
-    
-    ic_cat1 = stats.t.interval(0.95, len(dados_cat1)-1, 
-                              loc=np.mean(dados_cat1), 
-                              scale=stats.sem(dados_cat1))
-    ic_cat2 = stats.t.interval(0.95, len(dados_cat2)-1, 
-                              loc=np.mean(dados_cat2), 
-                              scale=stats.sem(dados_cat2))
+    # Só as estatísticas vão para o armazém (imutáveis e pequenas), não a Series da categoria
+    def resumo_categoria(categoria):
+        dados, ic = ic_categoria(df, categoria)
+        return {'media': float(np.mean(dados)), 'desvio': float(np.std(dados, ddof=1)),
+                'n': len(dados), 'ic': (float(ic[0]), float(ic[1]))}
+
+    # Cada categoria tem sua própria chave: reaproveitada em qualquer par escolhido
+    resumo_cat1 = armazem.obter_ou_calcular(
+        impressao_digital(load_versao(), "intervalos_confianca/categoria", parametros={'categoria': categoria1}),
+        lambda: resumo_categoria(categoria1),
+    )
+    resumo_cat2 = armazem.obter_ou_calcular(
+        impressao_digital(load_versao(), "intervalos_confianca/categoria", parametros={'categoria': categoria2}),
+        lambda: resumo_categoria(categoria2),
+    )
+    media_cat1, ic_cat1 = resumo_cat1['media'], resumo_cat1['ic']
+    media_cat2, ic_cat2 = resumo_cat2['media'], resumo_cat2['ic']
     
     # Visualização
     st.subheader("Comparação Visual")
@@ -292,13 +345,13 @@ else:
     y_pos = [1, 2]
     
     # Plot com erro simétrico para cada categoria
-    error_cat1 = (np.mean(dados_cat1) - ic_cat1[0], ic_cat1[1] - np.mean(dados_cat1))
-    error_cat2 = (np.mean(dados_cat2) - ic_cat2[0], ic_cat2[1] - np.mean(dados_cat2))
+    error_cat1 = (media_cat1 - ic_cat1[0], ic_cat1[1] - media_cat1)
+    error_cat2 = (media_cat2 - ic_cat2[0], ic_cat2[1] - media_cat2)
     
-    ax.errorbar(x=np.mean(dados_cat1), y=y_pos[0], 
+    ax.errorbar(x=media_cat1, y=y_pos[0], 
                xerr=[[error_cat1[0]], [error_cat1[1]]], fmt='o', color='blue', 
                label=categoria1, markersize=10, capsize=5)
-    ax.errorbar(x=np.mean(dados_cat2), y=y_pos[1], 
+    ax.errorbar(x=media_cat2, y=y_pos[1], 
                xerr=[[error_cat2[0]], [error_cat2[1]]], fmt='o', color='red', 
                label=categoria2, markersize=10, capsize=5)
     
@@ -324,7 +377,7 @@ else:
     
     **Implicações para o Negócio:**
     - {"A categoria " + categoria2 + " apresenta valores médios superiores, sugerindo foco em estratégias para aumentar o desempenho de " + categoria1 + "."
-      if np.mean(dados_cat2) > np.mean(dados_cat1) and not ((ic_cat1[1] > ic_cat2[0]) and (ic_cat2[1] > ic_cat1[0]))
+      if media_cat2 > media_cat1 and not ((ic_cat1[1] > ic_cat2[0]) and (ic_cat2[1] > ic_cat1[0]))
       else "A categoria " + categoria1 + " apresenta valores médios superiores, sugerindo foco em estratégias para aumentar o desempenho de " + categoria2 + "."
       if not ((ic_cat1[1] > ic_cat2[0]) and (ic_cat2[1] > ic_cat1[0]))
       else "As diferenças podem ser atribuídas ao acaso amostral, sendo necessário coletar mais dados."}
@@ -333,3 +386,68 @@ else:
     - Investigar fatores que possam explicar as diferenças nas médias.
     - Considerar estratégias promocionais ou ajustes operacionais específicos para cada categoria.
     """, unsafe_allow_html=True)
+
+# ========================================================================
+# Análise 4: Monitoramento Sequencial de Cancelamentos
+# ========================================================================
+else:
+    st.header("4. Monitoramento Sequencial da Taxa de Cancelamentos")
+
+    with st.expander("📚 Por que uma sequência de confiança?", expanded=True):
+        st.markdown("""
+        **Objetivo:**  
+        Acompanhar a taxa de cancelamentos **à medida que os pedidos chegam**, dia após dia.
+
+        **Problema do IC tradicional:**  
+        Recalcular o IC de Wald a cada novo lote e parar assim que ele cruza a meta aumenta a chance de alarmes falsos:
+        quanto mais vezes olhamos, maior a chance de um desvio casual parecer significativo.
+
+        **Solução:**  
+        A **sequência de confiança** é válida em todos os instantes ao mesmo tempo. Podemos consultá-la após cada lote
+        e a garantia de 95% continua valendo. Cada atualização usa apenas os totais acumulados, sem reprocessar o histórico.
+        """)
+
+    confidence_level = st.slider("Nível de Confiança", 0.80, 0.99, 0.95, key="seq_slider")
+    meta = 0.10
+    historico = load_monitoramento(meta, confidence_level)
+
+    if historico.empty:
+        st.warning("Nenhum pedido com data válida para o monitoramento.")
+    else:
+        atual = historico.iloc[-1]
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Pedidos Acumulados", f"{int(atual['total']):,}")
+        col2.metric("Taxa Observada", f"{atual['proporcao']*100:.1f}%")
+        col3.metric("Situação", atual['alerta'])
+
+        # Evolução da sequência de confiança
+        st.subheader("📈 Evolução da Sequência de Confiança")
+        fig, ax = plt.subplots(figsize=(10, 4))
+        # Pontos reduzidos por LTTB; os limites da sequência são monótonos e seguem os mesmos dias
+        pontos = historico.loc[lttb(historico['proporcao']).index]
+        ax.fill_between(pontos.index, pontos['cs_min'] * 100, pontos['cs_max'] * 100,
+                        color='#e74c3c', alpha=0.2, label=f'Sequência {int(confidence_level*100)}%')
+        ax.plot(pontos.index, pontos['proporcao'] * 100, color='#c0392b', label='Taxa acumulada')
+        ax.axhline(meta * 100, color='#2ecc71', linewidth=2, linestyle='--', label='Meta (10%)')
+        ax.set_ylim(0, max(historico['proporcao'].max() * 150, 25))
+        ax.set_ylabel('Taxa de Cancelamentos (%)')
+        ax.legend(loc='upper right')
+        st.pyplot(fig)
+
+        # Primeira data em que o alerta ficou crítico, se houver
+        criticos = historico.index[historico['alerta'] == CRITICO]
+        st.markdown(f"""
+        ### 💡 Interpretação Prática
+
+        - Com os dados acumulados, a taxa real de cancelamentos está entre **{atual['cs_min']*100:.1f}%** e **{atual['cs_max']*100:.1f}%**.
+        - {"O alerta ficou **Crítico** pela primeira vez em **" + criticos[0].strftime('%d/%m/%Y') + "**."
+           if len(criticos) else "O alerta nunca chegou ao nível **Crítico** no período."}
+
+        **Situação Atual:**
+        {"- ❌ **Crítico:** Toda a sequência está acima da meta de 10% → Ação imediata necessária"
+         if atual['alerta'] == CRITICO else
+         "- ✅ **Dentro da Meta:** A sequência está compatível com os objetivos estratégicos"
+         if atual['alerta'] == DENTRO_DA_META else
+         "- ⚠️ **Atenção:** O limite superior excede a meta → Monitoramento necessário"}
+        """)
@@ -1,21 +1,31 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import scipy.stats as stats
 import matplotlib.pyplot as plt
-import seaborn as sns
+
+from analise.cache_compartilhado import armazem, impressao_digital, versao_dados
+from analise.estatisticas import t_test_welch, qui_quadrado_entrega
+from analise.graficos import estatisticas_boxplot
+from analise.moedas import carregar_cotacoes, normalizar_moeda, avisar_moedas
 
 # Carregamento de dados (mesma função cache das outras páginas)
 @st.cache_data
 def load_data():
     df = pd.read_excel("df_selecionado.xlsx")
     df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], errors='coerce')
+    df = normalizar_moeda(df, carregar_cotacoes())  # Valores convertidos para R$
     return df
 
+# Versão da base usada nas chaves do armazém compartilhado entre sessões
+@st.cache_data
+def load_versao():
+    return versao_dados(load_data())
+
 df = load_data()
 
 # Título e introdução
 st.title("🧪 Parte 2: Testes de Hipótese")
+avisar_moedas(df, st.warning)
 st.markdown("---")
 st.markdown("""
 ### Objetivos
@@ -67,13 +77,11 @@ else:
             """)
 
         # Cálculo do t‑test (Welch, variâncias desiguais)
-        t_stat, p_val = stats.ttest_ind(sample1, sample2, equal_var=False)
-        # graus de liberdade aproximado de Welch
-        df_num = (sample1.var(ddof=1)/len(sample1) + sample2.var(ddof=1)/len(sample2))**2
-        t_stat, p_val = stats.ttest_ind(sample1, sample2, equal_var=False)
-        # graus de liberdade aproximado de Welch\        df_num = (sample1.var(ddof=1)/len(sample1) + sample2.var(ddof=1)/len(sample2))**2
-        df_den = ((sample1.var(ddof=1)/len(sample1))**2)/(len(sample1)-1) + ((sample2.var(ddof=1)/len(sample2))**2)/(len(sample2)-1)
-        gl = df_num/df_den
+        t_stat, p_val, gl = armazem.obter_ou_calcular(
+            impressao_digital(load_versao(), "testes_hipotese/t_test",
+                              filtros={'periodo': date_range}, parametros={'categorias': [cat1, cat2]}),
+            lambda: t_test_welch(sample1, sample2),
+        )
 
         # Exibir resultados numéricos
         col1, col2, col3 = st.columns(3)
@@ -105,7 +113,11 @@ else:
         # Boxplot com anotação de médias fora das caixas
         st.subheader("📦 Boxplot de Valor_Pedido por Categoria")
         fig, ax = plt.subplots()
-        sns.boxplot(x='Categoria', y='Valor_Pedido', data=df[df['Categoria'].isin([cat1, cat2])], ax=ax)
+        # Estatísticas da caixa pré-calculadas: a figura não cresce com o número de pedidos
+        ax.bxp([estatisticas_boxplot(sample1, cat1), estatisticas_boxplot(sample2, cat2)], positions=[0, 1],
+               patch_artist=True, boxprops={'facecolor': '#a9cce3'})
+        ax.set_xlabel('Categoria')
+        ax.set_ylabel('Valor_Pedido')
         # Anotar médias acima das caixas
         for i, m in enumerate([sample1.mean(), sample2.mean()]):
             ax.text(i, m + 0.05*(df['Valor_Pedido'].max()-df['Valor_Pedido'].min()), f"Média: R$ {m:.2f}", ha='center', va='bottom', color='black')
@@ -131,8 +143,12 @@ st.markdown("---")
 st.header("2. Qui‑Quadrado: Cancelamento x Nível de Entrega")
 st.markdown("Queremos verificar se o tipo de frete influencia a decisão de cancelar pedidos.")
 
-contingency = pd.crosstab(df['Nivel_Entrega'], df['Status_Pedido'])
-if contingency.shape[0] < 2 or contingency.shape[1] < 2:
+# Tabela de contingência e teste compartilhados entre sessões com o mesmo período
+contingency, resultado_chi = armazem.obter_ou_calcular(
+    impressao_digital(load_versao(), "testes_hipotese/qui_quadrado", filtros={'periodo': date_range}),
+    lambda: qui_quadrado_entrega(df),
+)
+if resultado_chi is None:
     st.warning("Dados insuficientes para o teste qui-quadrado.")
 else:
     with st.expander("📝 Hipóteses", expanded=True):
@@ -141,7 +157,7 @@ else:
         - **H₁ (alternativa):** Há **relação** entre status do pedido e nível de entrega.
         """)
 
-    chi2, p_chi, dof, expected = stats.chi2_contingency(contingency)
+    chi2, p_chi, dof, expected = resultado_chi
 
     col1, col2, col3 = st.columns(3)
     col1.metric("Chi2", f"{chi2:.3f}")
@@ -0,0 +1,90 @@
+import streamlit as st
+import pandas as pd
+
+from analise.graficos import lttb
+from analise.moedas import carregar_cotacoes, normalizar_moeda, avisar_moedas
+from analise.serie_temporal import agregar_diario, reamostrar, janela_movel, variacao_periodo
+
+@st.cache_data
+def load_data():
+    df = pd.read_excel("df_selecionado.xlsx")
+    df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], errors='coerce')
+    df = normalizar_moeda(df, carregar_cotacoes())  # Valores convertidos para R$
+    return df
+
+# Tabela diária pré-computada: todas as visões abaixo partem dela
+@st.cache_data
+def load_diario():
+    return agregar_diario(load_data())
+
+diario = load_diario()
+
+st.title("📅 Tendências ao Longo do Tempo")
+avisar_moedas(load_data(), st.warning)
+st.markdown("---")
+st.markdown("""
+### Objetivo desta Seção
+Acompanhar a evolução dos principais indicadores ao longo do tempo:
+- **Quantidade de pedidos**,
+- **Ticket médio** (valor médio por pedido),
+- **Taxa de cancelamento**.
+
+Todos os números partem de uma tabela com os totais de cada dia, o que permite trocar a granularidade e a janela móvel instantaneamente.
+""")
+
+if diario.empty:
+    st.warning("Nenhum pedido com data válida para montar a série temporal.")
+    st.stop()
+
+# Sidebar: controles da série
+with st.sidebar:
+    st.header("🔧 Configuração da Série")
+    frequencia = st.radio("Granularidade", ["Diária", "Semanal", "Mensal"], index=1)
+    janela = st.slider("Janela móvel (dias)", 7, 90, 30, step=1)
+
+# KPIs do período mais recente comparados ao período anterior de mesmo tamanho
+st.subheader(f"📊 Últimos {janela} dias vs {janela} dias anteriores")
+comparacao = variacao_periodo(diario, dias=janela)
+atual, variacao = comparacao['atual'], comparacao['variacao']
+col1, col2, col3 = st.columns(3)
+if atual is None:
+    st.info("Não há pedidos na janela mais recente.")
+else:
+    col1.metric("Pedidos", f"{atual['pedidos']:,.0f}",
+                delta=f"{variacao['pedidos']:+.1f}%" if variacao and variacao['pedidos'] is not None else None)
+    col2.metric("Ticket Médio",
+                f"R$ {atual['ticket_medio']:.2f}" if atual['ticket_medio'] is not None else "—",
+                delta=f"{variacao['ticket_medio']:+.1f}%" if variacao and variacao['ticket_medio'] is not None else None)
+    col3.metric("Taxa de Cancelamento", f"{atual['taxa_cancelamento']*100:.1f}%",
+                delta=f"{variacao['taxa_cancelamento']:+.1f} p.p." if variacao else None,
+                delta_color="inverse")
+
+# Série agregada na granularidade escolhida
+st.subheader(f"📈 Evolução {frequencia}")
+serie = reamostrar(diario, frequencia)
+aba1, aba2, aba3 = st.tabs(["Pedidos", "Ticket Médio", "Taxa de Cancelamento"])
+# Séries longas são reduzidas por LTTB antes de ir ao navegador
+with aba1:
+    st.line_chart(lttb(serie['pedidos']))
+with aba2:
+    st.line_chart(lttb(serie['ticket_medio']))
+with aba3:
+    st.line_chart(lttb(serie['taxa_cancelamento'] * 100))
+
+# Médias móveis diárias
+st.subheader(f"🔁 Janela Móvel de {janela} dias")
+movel = janela_movel(diario, janela)
+col1, col2 = st.columns(2)
+with col1:
+    st.markdown("**Ticket Médio (R$)**")
+    st.line_chart(lttb(movel['ticket_medio']))
+with col2:
+    st.markdown("**Taxa de Cancelamento (%)**")
+    st.line_chart(lttb(movel['taxa_cancelamento'] * 100))
+
+st.markdown(f"""
+### 💡 Como interpretar
+- A janela móvel suaviza oscilações diárias: cada ponto resume os **{janela} dias** anteriores.
+- Quedas persistentes no ticket médio ou altas na taxa de cancelamento indicam mudança de padrão, não apenas ruído.
+- Compare com a meta de **10% de cancelamentos** definida nos objetivos estratégicos.
+""")
@@ -0,0 +1,117 @@
+import streamlit as st
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from analise.geografia import precomputar_regioes, ranking_regioes, comparar_regioes
+from analise.moedas import carregar_cotacoes, normalizar_moeda, avisar_moedas
+
+@st.cache_data
+def load_data():
+    df = pd.read_excel("df_selecionado.xlsx")
+    df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], errors='coerce')
+    df = normalizar_moeda(df, carregar_cotacoes())  # Valores convertidos para R$
+    return df
+
+# Momentos por estado e cidade: calculados uma vez, reaproveitados em cada interação
+@st.cache_data
+def load_regioes():
+    return precomputar_regioes(load_data())
+
+regioes = load_regioes()
+
+st.title("🗺️ Análise Geográfica")
+avisar_moedas(load_data(), st.warning)
+st.markdown("---")
+st.markdown("""
+### Objetivo desta Seção
+Responder à pergunta investigativa **"Há diferença significativa entre estados?"** olhando para:
+- O **ticket médio** de cada estado ou cidade de destino (`Ship State`, `Ship City`),
+- A **taxa de cancelamento** por região,
+- Testes que verificam se as diferenças entre estados vão além do acaso.
+""")
+st.markdown("---")
+
+# Sidebar: controles do ranking
+with st.sidebar:
+    st.header("🔧 Configuração")
+    nivel = st.radio("Nível Geográfico", ["Estado", "Cidade"])
+    criterio = st.selectbox("Ordenar por", ["Ticket Médio", "Taxa de Cancelamento"])
+    min_pedidos = st.number_input("Mínimo de pedidos por região", min_value=2, value=30, step=10)
+    top_n = st.slider("Regiões exibidas", 5, 50, 15)
+
+coluna_ordem = 'ticket_medio' if criterio == "Ticket Médio" else 'taxa_cancelamento'
+ranking = ranking_regioes(regioes['regioes'][nivel], ordenar_por=coluna_ordem, min_pedidos=min_pedidos)
+
+if ranking.empty:
+    st.warning("Nenhuma região atinge o mínimo de pedidos escolhido.")
+    st.stop()
+
+# Rótulos legíveis: "CIDADE (ESTADO)" no nível de cidade
+if nivel == "Cidade":
+    rotulos = [f"{cidade} ({estado})" for estado, cidade in ranking.index]
+else:
+    rotulos = ranking.index.tolist()
+ranking.index = rotulos
+
+col1, col2, col3 = st.columns(3)
+col1.metric(f"Regiões ({nivel})", f"{len(ranking):,}")
+col2.metric("Pedidos Cobertos", f"{ranking['pedidos'].sum():,}")
+col3.metric(f"Maior {criterio}", ranking.index[0])
+
+# Ranking com intervalos de confiança
+st.subheader(f"🏆 Top {top_n} por {criterio}")
+topo = ranking.head(top_n)
+fig, ax = plt.subplots(figsize=(10, max(3, 0.35 * len(topo))))
+if coluna_ordem == 'ticket_medio':
+    centro, inferior, superior = topo['ticket_medio'], topo['ic_ticket_min'], topo['ic_ticket_max']
+    ax.set_xlabel("Ticket Médio (R$)")
+else:
+    centro, inferior, superior = (topo['taxa_cancelamento'] * 100, topo['ic_taxa_min'] * 100,
+                                  topo['ic_taxa_max'] * 100)
+    ax.axvline(10, color='#2ecc71', linestyle='--', label='Meta (10%)')
+    ax.set_xlabel("Taxa de Cancelamento (%)")
+    ax.legend()
+ax.errorbar(x=centro, y=range(len(topo)), xerr=[centro - inferior, superior - centro],
+            fmt='o', color='#3498db', capsize=4)
+ax.set_yticks(range(len(topo)))
+ax.set_yticklabels(topo.index)
+ax.invert_yaxis()
+ax.set_title(f"{criterio} por {nivel} com IC 95%")
+st.pyplot(fig)
+
+with st.expander("🔢 Tabela do Ranking", expanded=False):
+    st.dataframe(topo.style.format({
+        'ticket_medio': "R$ {:.2f}", 'ic_ticket_min': "R$ {:.2f}", 'ic_ticket_max': "R$ {:.2f}",
+        'taxa_cancelamento': "{:.1%}", 'ic_taxa_min': "{:.1%}", 'ic_taxa_max': "{:.1%}",
+    }), use_container_width=True)
+
+st.markdown("---")
+
+# Testes entre estados
+st.header("🧪 Os estados diferem no ticket médio?")
+with st.expander("📝 Hipóteses", expanded=True):
+    st.markdown("""
+    - **H₀ (nula):** O ticket médio é o mesmo em todos os estados.  
+    - **H₁ (alternativa):** Pelo menos um estado tem ticket médio diferente.
+
+    Usamos a **ANOVA de um fator** (compara médias) e o **Kruskal-Wallis** (compara distribuições por postos,
+    mais robusto a outliers, comuns em valores de pedidos).
+    """)
+
+resultado = comparar_regioes(regioes['regioes']['Estado'], regioes['postos_estados'], min_pedidos=min_pedidos)
+if resultado is None:
+    st.warning("São necessários pelo menos dois estados com o mínimo de pedidos para os testes.")
+else:
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("F (ANOVA)", f"{resultado['f_stat']:.3f}")
+    col2.metric("p-valor ANOVA", f"{resultado['p_anova']:.3f}")
+    col3.metric("H (Kruskal-Wallis)", f"{resultado['h_stat']:.3f}")
+    col4.metric("p-valor Kruskal", f"{resultado['p_kruskal']:.3f}")
+
+    alpha = 0.05
+    if resultado['p_anova'] <= alpha or resultado['p_kruskal'] <= alpha:
+        st.markdown(f"**Rejeitamos H₀** (p≤{alpha}): há diferença significativa entre os {resultado['grupos']} estados comparados.")
+        st.markdown("💡 Conclusão de negócio: vale diferenciar estratégias de frete e preço por estado, começando pelos extremos do ranking.")
+    else:
+        st.markdown(f"**Não rejeitamos H₀** (p>{alpha}): não há evidência de diferença entre os {resultado['grupos']} estados comparados.")
+        st.markdown("💡 Conclusão de negócio: uma política única por estado parece adequada; investigar outros fatores.")
@@ -0,0 +1,109 @@
+import streamlit as st
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from analise.moedas import carregar_cotacoes, normalizar_moeda, avisar_moedas
+from analise.promocoes import matriz_promocoes, efeito_promocoes
+
+@st.cache_data
+def load_data():
+    df = pd.read_excel("df_selecionado.xlsx")
+    df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], errors='coerce')
+    df = normalizar_moeda(df, carregar_cotacoes())  # Valores convertidos para R$
+    return df
+
+# A coluna Promotion IDs é lida uma única vez; os filtros apenas recortam linhas
+@st.cache_data
+def load_matriz_promocoes():
+    return matriz_promocoes(load_data()['Promotion IDs'])
+
+df = load_data()
+matriz, nomes = load_matriz_promocoes()
+
+st.title("🏷️ Efeito das Promoções")
+avisar_moedas(df, st.warning)
+st.markdown("---")
+st.markdown("""
+### Objetivo desta Seção
+Responder às perguntas levantadas na Análise Exploratória:
+- **A aplicação de promoções aumenta a probabilidade de compras acima de R$ 500?**
+- **Pedidos com promoções aplicadas têm menor variabilidade no valor total?**
+
+Cada promoção é comparada com os pedidos que **não** a utilizaram, quanto ao ticket médio,
+à chance de o pedido passar do limite escolhido e à variabilidade dos valores.
+""")
+st.markdown("---")
+
+# Sidebar: filtros e parâmetros
+with st.sidebar:
+    st.header("🔧 Filtros")
+    date_range = st.date_input("Período", [df['Data_Pedido'].min(), df['Data_Pedido'].max()])
+    limite = st.number_input("Limite de valor (R$)", min_value=0, value=500, step=50)
+    min_pedidos = st.number_input("Mínimo de pedidos por promoção", min_value=2, value=30, step=10)
+
+mascara = ((df['Data_Pedido'] >= pd.to_datetime(date_range[0])) &
+           (df['Data_Pedido'] <= pd.to_datetime(date_range[1]))).to_numpy()
+efeitos = efeito_promocoes(matriz[mascara], nomes, df.loc[mascara, 'Valor_Pedido'],
+                           limite=limite, min_pedidos=min_pedidos)
+
+if efeitos.empty:
+    st.warning("Nenhuma promoção atinge o mínimo de pedidos no período selecionado.")
+    st.stop()
+
+# Visão geral: qualquer promoção vs nenhuma
+if "Qualquer promoção" in efeitos.index:
+    geral = efeitos.loc["Qualquer promoção"]
+    st.subheader("📊 Pedidos com Promoção vs Sem Promoção")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Ticket Médio com Promoção", f"R$ {geral['ticket_com']:.2f}",
+                delta=f"R$ {geral['uplift_ticket']:+.2f} vs sem promoção")
+    col2.metric(f"P(Valor > R$ {limite})", f"{geral['p_acima_com']*100:.1f}%",
+                delta=f"{geral['uplift_p_acima']*100:+.1f} p.p. vs sem promoção")
+    col3.metric("Razão de Variâncias", f"{geral['razao_variancia']:.2f}",
+                help="Variância com promoção ÷ variância sem promoção. Abaixo de 1 indica menor variabilidade.")
+
+    st.markdown(f"""
+    ### 💡 Interpretação Prática
+    - {"Pedidos com promoção têm **maior** chance de passar de R$ " + str(limite) + "."
+       if geral['ic_p_acima_min'] > 0 else
+       "Pedidos com promoção têm **menor** chance de passar de R$ " + str(limite) + "."
+       if geral['ic_p_acima_max'] < 0 else
+       "Não há evidência de que promoções alterem a chance de passar de R$ " + str(limite) + "."}
+      (IC 95% da diferença: {geral['ic_p_acima_min']*100:.1f} a {geral['ic_p_acima_max']*100:.1f} p.p.)
+    - {"Pedidos com promoção apresentam **menor variabilidade** no valor total."
+       if geral['ic_razao_max'] < 1 else
+       "Pedidos com promoção apresentam **maior variabilidade** no valor total."
+       if geral['ic_razao_min'] > 1 else
+       "Não há evidência de diferença na variabilidade do valor total."}
+      (IC 95% da razão: {geral['ic_razao_min']:.2f} a {geral['ic_razao_max']:.2f})
+    """)
+
+st.markdown("---")
+
+# Efeito por promoção
+st.subheader("🏆 Efeito por Promoção no Ticket Médio")
+por_promocao = efeitos.drop(index="Qualquer promoção", errors='ignore').sort_values('uplift_ticket', ascending=False)
+top_n = st.slider("Promoções exibidas", 5, 50, 15)
+topo = por_promocao.head(top_n)
+
+if not topo.empty:
+    fig, ax = plt.subplots(figsize=(10, max(3, 0.35 * len(topo))))
+    ax.errorbar(x=topo['uplift_ticket'], y=range(len(topo)),
+                xerr=[topo['uplift_ticket'] - topo['ic_uplift_min'], topo['ic_uplift_max'] - topo['uplift_ticket']],
+                fmt='o', color='#8e44ad', capsize=4)
+    ax.axvline(0, color='gray', linestyle='--')
+    ax.set_yticks(range(len(topo)))
+    ax.set_yticklabels(topo.index)
+    ax.invert_yaxis()
+    ax.set_xlabel("Diferença no Ticket Médio (R$)")
+    ax.set_title("Uplift no Ticket Médio com IC 95%")
+    st.pyplot(fig)
+
+with st.expander("🔢 Tabela Completa", expanded=False):
+    st.dataframe(por_promocao.style.format({
+        'ticket_com': "R$ {:.2f}", 'ticket_sem': "R$ {:.2f}", 'uplift_ticket': "R$ {:+.2f}",
+        'ic_uplift_min': "R$ {:.2f}", 'ic_uplift_max': "R$ {:.2f}",
+        'p_acima_com': "{:.1%}", 'p_acima_sem': "{:.1%}", 'uplift_p_acima': "{:+.1%}",
+        'ic_p_acima_min': "{:.1%}", 'ic_p_acima_max': "{:.1%}",
+        'razao_variancia': "{:.2f}", 'ic_razao_min': "{:.2f}", 'ic_razao_max': "{:.2f}",
+    }), use_container_width=True)
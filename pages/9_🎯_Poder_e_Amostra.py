@@ -0,0 +1,115 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+from analise.moedas import carregar_cotacoes, normalizar_moeda, avisar_moedas
+from analise.poder import (SIMULACOES_PADRAO, momentos_por_categoria, poder_welch_pares, poder_qui_quadrado,
+                           n_qui_quadrado, efeito_w, simular_poder_welch, simular_poder_qui_quadrado,
+                           validar_monte_carlo)
+
+@st.cache_data
+def load_data():
+    df = pd.read_excel("df_selecionado.xlsx")
+    df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], errors='coerce')
+    df = normalizar_moeda(df, carregar_cotacoes())  # Valores convertidos para R$
+    return df
+
+df = load_data()
+
+st.title("🎯 Poder Estatístico e Tamanho de Amostra")
+avisar_moedas(df, st.warning)
+st.markdown("---")
+st.markdown("""
+### Objetivo desta Seção
+Um p-valor acima de 0.05 não prova que as categorias são iguais: pode ser que **faltem pedidos** para enxergar a diferença.
+Aqui calculamos, para os mesmos testes da página de Testes de Hipótese:
+- O **poder alcançado**: a chance de o teste detectar um efeito do tamanho que importa para o negócio;
+- O **tamanho de amostra necessário** para atingir o poder desejado.
+""")
+st.markdown("---")
+
+# Sidebar: mesmos filtros da página de testes e parâmetros do planejamento
+with st.sidebar:
+    st.header("🔧 Filtros Gerais")
+    date_range = st.date_input("Período", [df['Data_Pedido'].min(), df['Data_Pedido'].max()])
+    df = df[(df['Data_Pedido'] >= pd.to_datetime(date_range[0])) & (df['Data_Pedido'] <= pd.to_datetime(date_range[1]))]
+    st.header("🎯 Planejamento")
+    alpha = st.select_slider("Nível de significância (α)", [0.01, 0.05, 0.10], value=0.05)
+    poder_desejado = st.slider("Poder desejado", 0.50, 0.99, 0.80)
+
+# -----------------------------
+# t-test de Welch: todos os pares de categorias
+# -----------------------------
+st.header("1. t‑test: Ticket Médio entre Categorias")
+efeito = st.number_input("Diferença mínima relevante no ticket médio (R$)", min_value=1.0, value=50.0, step=10.0)
+
+momentos = momentos_por_categoria(df)
+pares = poder_welch_pares(momentos, efeito, alpha=alpha, poder_desejado=poder_desejado)
+
+if pares.empty:
+    st.warning("Não há categorias suficientes para calcular o poder do t-test.")
+else:
+    pares['situação'] = np.where(
+        pares['p_valor'] <= alpha, "✅ Diferença significativa",
+        np.where(pares['poder'] >= poder_desejado, "⚖️ Sem diferença relevante", "⚠️ Amostra insuficiente"))
+    st.dataframe(pares.style.format({
+        'diferenca': "R$ {:+.2f}", 'p_valor': "{:.3f}", 'poder': "{:.1%}", 'n_necessario': "{:,}",
+    }), use_container_width=True)
+
+    st.markdown(f"""
+    **Como ler a tabela:**
+    - **poder**: chance de o teste detectar uma diferença de **R$ {efeito:.2f}** com os pedidos atuais.
+    - **n_necessario**: pedidos por categoria para atingir **{poder_desejado:.0%}** de poder.
+    - ⚠️ **Amostra insuficiente**: o resultado não significativo pode ser apenas falta de dados; não conclua que as categorias são iguais.
+    """)
+
+st.markdown("---")
+
+# -----------------------------
+# Qui-quadrado: Cancelamento x Nível de Entrega
+# -----------------------------
+st.header("2. Qui‑Quadrado: Cancelamento x Nível de Entrega")
+contingency = pd.crosstab(df['Nivel_Entrega'], df['Status_Pedido'])
+
+if contingency.shape[0] < 2 or contingency.shape[1] < 2:
+    st.warning("Dados insuficientes para o teste qui-quadrado.")
+else:
+    w_alvo = st.select_slider("Tamanho de efeito (w de Cohen)", [0.05, 0.10, 0.20, 0.30, 0.50], value=0.10,
+                              help="Referências de Cohen: 0.1 pequeno, 0.3 médio, 0.5 grande.")
+    n_total = int(contingency.to_numpy().sum())
+    gl = (contingency.shape[0] - 1) * (contingency.shape[1] - 1)
+    w_observado = efeito_w(contingency)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("w observado", f"{w_observado:.3f}")
+    col2.metric(f"Poder para w = {w_alvo}", f"{poder_qui_quadrado(n_total, gl, w_alvo, alpha):.1%}")
+    col3.metric("Pedidos necessários", f"{n_qui_quadrado(gl, w_alvo, alpha, poder_desejado):,}",
+                delta=f"{n_total:,} disponíveis", delta_color="off")
+
+st.markdown("---")
+
+# -----------------------------
+# Validação por Monte Carlo
+# -----------------------------
+st.header("🎲 Validação por Monte Carlo")
+st.markdown("""
+As fórmulas acima são aproximações. A simulação sorteia milhares de repetições dos testes com os tamanhos
+de amostra atuais e confere a fração de vezes em que o efeito é detectado.
+""")
+if st.button("Rodar simulações"):
+    with st.spinner("Simulando em paralelo..."):
+        if not pares.empty:
+            tarefas = [(linha.n_a, momentos.loc[linha.categoria_a, 'variancia'],
+                        linha.n_b, momentos.loc[linha.categoria_b, 'variancia'],
+                        efeito, alpha, SIMULACOES_PADRAO, semente)
+                       for semente, linha in enumerate(pares.itertuples())]
+            pares['poder_simulado'] = validar_monte_carlo(simular_poder_welch, tarefas)
+            st.dataframe(pares[['categoria_a', 'categoria_b', 'poder', 'poder_simulado']].style.format({
+                'poder': "{:.1%}", 'poder_simulado': "{:.1%}",
+            }), use_container_width=True)
+        if contingency.shape[0] >= 2 and contingency.shape[1] >= 2:
+            probabilidades = contingency.to_numpy() / n_total
+            poder_simulado = validar_monte_carlo(
+                simular_poder_qui_quadrado, [(probabilidades, n_total, alpha, SIMULACOES_PADRAO, 0)])[0]
+            st.metric("Qui-quadrado: poder simulado para o efeito observado", f"{poder_simulado:.1%}",
+                      delta=f"fórmula: {poder_qui_quadrado(n_total, gl, w_observado, alpha):.1%}", delta_color="off")
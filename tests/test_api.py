@@ -0,0 +1,187 @@
+"""Requisições HTTP reais contra o servidor de `analise.api` em uma porta livre."""
+
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analise import api
+
+
+@pytest.fixture(scope="module")
+def base(tmp_path_factory):
+    rng = np.random.default_rng(7)
+    n = 400
+    df = pd.DataFrame({
+        'ID_Pedido': np.arange(n),
+        'Data_Pedido': pd.Timestamp('2022-04-01') + pd.to_timedelta(rng.integers(0, 90, n), unit='D'),
+        'Status_Pedido': rng.choice(["Enviado", "Cancelado", "Entregue"], n),
+        'Nivel_Entrega': rng.choice(["Padrão", "Expresso"], n),
+        'Categoria': rng.choice(["Roupas", "Casa"], n),
+        'Valor_Pedido': np.round(rng.gamma(2.0, 300, n), 2),
+    })
+    caminho = tmp_path_factory.mktemp("dados") / "pedidos.xlsx"
+    df.to_excel(caminho, index=False)
+    return api.BaseDados(str(caminho))
+
+
+def com_servidor(base, teste, **opcoes):
+    """Sobe o servidor em 127.0.0.1 numa porta livre e roda `teste(servidor, porta)`."""
+    async def principal():
+        servidor = api.Servidor(base, **opcoes)
+        tcp = await asyncio.start_server(servidor.conexao, "127.0.0.1", 0)
+        async with tcp:
+            return await teste(servidor, tcp.sockets[0].getsockname()[1])
+    return asyncio.run(principal())
+
+
+async def requisitar(porta, bruto, fechar_envio=False):
+    reader, writer = await asyncio.open_connection("127.0.0.1", porta)
+    writer.write(bruto)
+    if fechar_envio:
+        writer.write_eof()
+    await writer.drain()
+    resposta = await reader.read()
+    writer.close()
+    cabecalho, _, corpo = resposta.partition(b"\r\n\r\n")
+    linhas = cabecalho.decode('latin-1').split("\r\n")
+    cabecalhos = {k.strip().lower(): v.strip() for k, v in (l.split(":", 1) for l in linhas[1:])}
+    return int(linhas[0].split()[1]), cabecalhos, json.loads(corpo) if corpo else None
+
+
+def post_lote(consultas, etag=None):
+    corpo = json.dumps({'consultas': consultas}).encode('utf-8')
+    extra = f"If-None-Match: {etag}\r\n" if etag else ""
+    return (f"POST /v1/lote HTTP/1.1\r\nHost: teste\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(corpo)}\r\n{extra}\r\n").encode('latin-1') + corpo
+
+
+CONSULTAS = [
+    {'tipo': 'cancelamento', 'parametros': {'metodo': "Wilson", 'confianca': 0.9}},
+    {'tipo': 'ticket', 'filtros': {'categorias': ["Roupas"]}},
+    {'tipo': 't_test', 'parametros': {'categoria_a': "Roupas", 'categoria_b': "Casa"}},
+    {'tipo': 'qui_quadrado', 'filtros': {'periodo': ["2022-04-01", "2022-05-15"]}},
+]
+
+
+def test_versao(base):
+    async def teste(servidor, porta):
+        return await requisitar(porta, b"GET /v1/versao HTTP/1.1\r\nHost: teste\r\n\r\n")
+    status, _, corpo = com_servidor(base, teste)
+    assert status == 200
+    assert corpo['linhas'] == 400 and corpo['versao']
+
+
+def test_lote_200_e_304_com_etag(base):
+    async def teste(servidor, porta):
+        primeira = await requisitar(porta, post_lote(CONSULTAS))
+        segunda = await requisitar(porta, post_lote(CONSULTAS, etag=primeira[1]['etag']))
+        return primeira, segunda
+    (status, cabecalhos, corpo), (status_304, cabecalhos_304, corpo_304) = com_servidor(base, teste)
+
+    assert status == 200
+    assert [r['tipo'] for r in corpo['respostas']] == [c['tipo'] for c in CONSULTAS]
+    assert all('resultado' in r for r in corpo['respostas'])
+    cancelamento = corpo['respostas'][0]['resultado']
+    assert cancelamento['total'] == 400 and cancelamento['ic_min'] < cancelamento['p_hat'] < cancelamento['ic_max']
+
+    assert status_304 == 304
+    assert cabecalhos_304['etag'] == cabecalhos['etag']
+    assert corpo_304 is None
+
+
+def test_erros_por_consulta_com_mensagens_fixas(base):
+    consultas = [
+        {'tipo': 'inexistente'},
+        [1, 2],
+        {'tipo': 'cancelamento', 'parametros': {'confianca': 1.5}},
+        {'tipo': 'cancelamento', 'parametros': {'metodo': ["Wald"]}},
+        {'tipo': 'ticket', 'filtros': {'periodo': ["2022-04-01"]}},
+        {'tipo': 'ticket', 'filtros': {'categorias': "Roupas"}},
+        {'tipo': 't_test', 'parametros': {'categoria_a': 1, 'categoria_b': "Casa"}},
+        {'tipo': 'qui_quadrado', 'parametros': {'inesperado': True}},
+        {'tipo': 'cancelamento', 'filtros': {'categorias': ["Nenhuma"]}},
+        {'tipo': 'ticket'},
+    ]
+
+    async def teste(servidor, porta):
+        return await requisitar(porta, post_lote(consultas))
+    status, _, corpo = com_servidor(base, teste)
+
+    assert status == 200
+    erros = [r.get('erro') for r in corpo['respostas']]
+    assert erros == [
+        api.ERROS['tipo'], api.ERROS['consulta'], api.ERROS['confianca'], api.ERROS['metodo'],
+        api.ERROS['periodo'], api.ERROS['categorias'], api.ERROS['categorias_t_test'],
+        api.ERROS['parametros'], api.ERROS['segmento_vazio'], None,
+    ]
+    assert 'resultado' in corpo['respostas'][-1]
+
+
+@pytest.mark.parametrize("bruto", [
+    b"POST /v1/lote HTTP/1.1\r\nContent-Length: 50\r\n\r\n{\"consultas\": [",
+    b"POST /v1/lote HTTP/1.1\r\nContent-Length: -1\r\n\r\n",
+    b"GET\r\n\r\n",
+])
+def test_requisicao_truncada_ou_malformada_400(base, bruto):
+    async def teste(servidor, porta):
+        return await requisitar(porta, bruto, fechar_envio=True)
+    status, _, corpo = com_servidor(base, teste)
+    assert status == 400
+    assert corpo == {'erro': "requisição HTTP inválida"}
+
+
+def test_corpo_muito_grande_413(base):
+    cabecalho = f"POST /v1/lote HTTP/1.1\r\nContent-Length: {api.MAX_CORPO_BYTES + 1}\r\n\r\n"
+
+    async def teste(servidor, porta):
+        return await requisitar(porta, cabecalho.encode('latin-1'))
+    status, _, corpo = com_servidor(base, teste)
+    assert status == 413
+    assert corpo == {'erro': "corpo muito grande"}
+
+
+def test_corpo_nao_json_400(base):
+    bruto = b"POST /v1/lote HTTP/1.1\r\nContent-Length: 8\r\n\r\nnao-json"
+
+    async def teste(servidor, porta):
+        return await requisitar(porta, bruto)
+    status, _, _ = com_servidor(base, teste)
+    assert status == 400
+
+
+def test_servidor_saturado_503(base, monkeypatch):
+    monkeypatch.setattr(api, "ESPERA_MAXIMA_SEGUNDOS", 0.2)
+
+    async def teste(servidor, porta):
+        # Ocupa a única vaga de cálculo: nem a leitura da base para a ETag pode passar
+        await servidor._limite.acquire()
+        try:
+            lote = await requisitar(porta, post_lote(CONSULTAS))
+            versao = await requisitar(porta, b"GET /v1/versao HTTP/1.1\r\n\r\n")
+        finally:
+            servidor._limite.release()
+        depois = await requisitar(porta, b"GET /v1/versao HTTP/1.1\r\n\r\n")
+        return lote, versao, depois
+    lote, versao, depois = com_servidor(base, teste, calculos_simultaneos=1)
+
+    assert lote[0] == 503 and lote[2] == {'erro': "servidor ocupado"}
+    assert 'etag' not in lote[1]
+    assert versao[0] == 503
+    assert depois[0] == 200
+
+
+def test_rotas_e_metodos(base):
+    async def teste(servidor, porta):
+        return (await requisitar(porta, b"GET /v1/nada HTTP/1.1\r\n\r\n"),
+                await requisitar(porta, b"GET /v1/lote HTTP/1.1\r\n\r\n"))
+    nada, lote_get = com_servidor(base, teste)
+    assert nada[0] == 404
+    assert lote_get[0] == 405
+
+
+def test_json_sem_valores_nao_finitos():
+    assert api._json({'a': np.float64(np.inf), 'b': [-np.inf, np.nan], 'c': np.int64(3)}) == \
+        {'a': None, 'b': [None, None], 'c': 3}
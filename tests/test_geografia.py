@@ -0,0 +1,55 @@
+"""Confere os testes geográficos (calculados por estatísticas pré-agregadas) contra o scipy."""
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.stats as stats
+
+from analise.geografia import precomputar_regioes, comparar_regioes
+
+
+def base_geografica(semente=5):
+    # Três estados grandes com a mesma distribuição e 100 estados pequenos de
+    # valores baixos (com empates), que ficam de fora com o mínimo padrão
+    rng = np.random.default_rng(semente)
+    estados = np.concatenate([np.repeat(["SP", "RJ", "MG"], 3_000),
+                              np.repeat([f"E{i:03d}" for i in range(100)], 5),
+                              np.repeat(["BA"], 40)])
+    grandes = ~np.char.startswith(estados.astype(str), "E")
+    valor = np.where(grandes, np.round(rng.gamma(2.0, 300, len(estados))),
+                     np.round(rng.gamma(2.0, 20, len(estados))))
+    valor[rng.random(len(estados)) < 0.02] = np.nan
+    return pd.DataFrame({
+        'Ship State': estados,
+        'Ship City': rng.choice(["A", "B", "C"], len(estados)),
+        'Valor_Pedido': valor,
+        'Status_Pedido': rng.choice(["Enviado", "Cancelado"], len(estados)),
+    })
+
+
+@pytest.fixture(scope="module")
+def base():
+    df = base_geografica()
+    return df, precomputar_regioes(df)
+
+
+@pytest.mark.parametrize("min_pedidos", [0, 5, 30, 41, 3_000])
+def test_anova_e_kruskal_batem_com_scipy(base, min_pedidos):
+    df, regioes = base
+    momentos = regioes['regioes']['Estado']
+    resultado = comparar_regioes(momentos, regioes['postos_estados'], min_pedidos)
+
+    mantidos = momentos.index[momentos['pedidos'] >= min_pedidos]
+    grupos = [df.loc[df['Ship State'] == e, 'Valor_Pedido'].dropna() for e in mantidos]
+    anova, kruskal = stats.f_oneway(*grupos), stats.kruskal(*grupos)
+
+    assert resultado['grupos'] == len(mantidos)
+    assert resultado['f_stat'] == pytest.approx(anova.statistic, rel=1e-9)
+    assert resultado['p_anova'] == pytest.approx(anova.pvalue, rel=1e-6, abs=1e-300)
+    assert resultado['h_stat'] == pytest.approx(kruskal.statistic, rel=1e-9)
+    assert resultado['p_kruskal'] == pytest.approx(kruskal.pvalue, rel=1e-6, abs=1e-300)
+
+
+def test_menos_de_dois_estados(base):
+    _, regioes = base
+    assert comparar_regioes(regioes['regioes']['Estado'], regioes['postos_estados'], 10_000) is None
@@ -1,6 +1,9 @@
 import streamlit as st
 import pandas as pd
 
+from analise.moedas import carregar_cotacoes, normalizar_moeda, avisar_moedas
+from analise.serie_temporal import agregar_diario, variacao_recente
+
 # Configurações da Página
 st.set_page_config(
     page_title="Dashboard Estratégico - E-Commerce",
@@ -14,15 +17,28 @@ st.set_page_config(
 def load_data():
     df = pd.read_excel("df_selecionado.xlsx")
     df['Data_Pedido'] = pd.to_datetime(df['Data_Pedido'], errors='coerce') 
+    df = normalizar_moeda(df, carregar_cotacoes())  # Valores convertidos para R$
     return df
 
+@st.cache_data
+def load_diario():
+    return agregar_diario(load_data())
+
 df = load_data()
+diario = load_diario()
+
+# Variações calculadas a partir da tabela diária: último trimestre vs anterior,
+# ou a maior janela (30 ou 7 dias) que caiba duas vezes no histórico
+recente = variacao_recente(diario)
+meta_cancelamento = 0.10
+taxa_sucesso = 100 - (df[df['Status_Pedido'] == 'Cancelado'].shape[0] / df.shape[0] * 100)
 
 # ============ CONTEÚDO PRINCIPAL ============ 
 
 # Cabeçalho com título e slogan
 st.title("📈 Painel de Controle Estratégico para E-Commerce")
 st.markdown("#### Uma ferramenta para transformar dados em ações estratégicas")
+avisar_moedas(df, st.warning)
 st.markdown("---")
 
 # Seção: Introdução ao Projeto e Descrição do Dataset
@@ -94,7 +110,10 @@ with st.container():
     with col2:
         st.metric("Total de Pedidos", 
                 f"{df['ID_Pedido'].nunique():,}", 
-                delta="-2% vs último trimestre",
+                delta=(f"{recente['variacao']['pedidos']:+.1f}% vs {recente['dias']} dias anteriores"
+                       if recente['variacao'] and recente['variacao']['pedidos'] is not None
+                       else "n/d vs período anterior"),
+                delta_color="normal" if recente['variacao'] else "off",
                 help="Número total de transações registradas")
     
     with col3:
@@ -104,8 +123,8 @@ with st.container():
     
     with col4:
         st.metric("Taxa de Sucesso", 
-                f"{100 - (df[df['Status_Pedido'] == 'Cancelado'].shape[0] / df.shape[0] * 100):.1f}%",
-                delta="+3.2% vs meta",
+                f"{taxa_sucesso:.1f}%",
+                delta=f"{taxa_sucesso - (1 - meta_cancelamento) * 100:+.1f} p.p. vs meta",
                 help="Pedidos entregues com sucesso")
     
     # Prévia dos Dados
@@ -153,6 +172,39 @@ with st.container():
         - 📊 Qui-quadrado de independência  
         """)
 
+    guide_cols = st.columns(4)
+    with guide_cols[0]:
+        st.markdown("""
+        ### Tendências
+        - 📅 Séries diária, semanal e mensal  
+        - 🔁 Janelas móveis de KPIs  
+        - 📊 Período atual vs anterior  
+        """)
+
+    with guide_cols[1]:
+        st.markdown("""
+        ### Análise Geográfica
+        - 🗺️ Ranking por estado e cidade  
+        - 📏 ICs de ticket e cancelamento  
+        - 🧪 ANOVA e Kruskal-Wallis  
+        """)
+
+    with guide_cols[2]:
+        st.markdown("""
+        ### Promoções
+        - 🏷️ Com vs sem promoção  
+        - 🏆 Efeito por promoção  
+        - 📉 Ticket médio comparado  
+        """)
+
+    with guide_cols[3]:
+        st.markdown("""
+        ### Poder e Amostra
+        - 🎯 Poder dos testes atuais  
+        - 📐 Tamanho de amostra necessário  
+        - 🎲 Validação por Monte Carlo  
+        """)
+
 # CSS Customizado para os cards e textos
 st.markdown("""
 <style>